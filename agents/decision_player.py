@@ -2,14 +2,29 @@ from game.players import BasePokerPlayer
 from copy import deepcopy
 from itertools import combinations
 from game.engine.card import Card
-from game.engine.deck import Deck
-from game.engine.hand_evaluator import HandEvaluator
+from game.equity.equity_estimator import EquityEstimator
+from game.equity.equity_memo import EquityMemo
+from game.equity.range_tracker import RangeTracker
+from game.equity.time_budget import TimeBudget
 import random
 import math
+import time
 from collections import Counter
 
 
 class DecisionPlayer(BasePokerPlayer):
+
+    # 所有實例共用同一個估計器，抽樣用的牌堆只配置一次
+    equity_estimator = EquityEstimator()
+    equity_memo = None
+    # 設成 EquityCache 時，模擬結果會跨執行累積在磁碟上
+    equity_cache = None
+    hole_card = None
+    # 每個對手一個，依他這一局的動作縮小可能的手牌範圍
+    range_trackers = None
+    # 每場遊戲可以花在估計勝率上的總秒數
+    GAME_SECONDS = 10
+    time_budget = None
     
     def declare_action(self, valid_actions, hole_card, round_state):
         
@@ -48,7 +63,20 @@ class DecisionPlayer(BasePokerPlayer):
 
 
         pot_odds = call_amount / (pot_amount + call_amount) if (pot_amount + call_amount) > 0 else 0
-        win_rate = self.estimate_win_rate(my_hole_cards, community_cards, num_simulations=2000)
+        num_opponents = self.count_opponents(round_state)
+        opponent_ranges = self.opponent_ranges(round_state)
+        # 背景的模擬每抽完一批就併進 memo，這裡一開始估計它就會停下，
+        # 不用等它跑完，直接接著已經累積的結果往下抽
+        # 只要信賴區間不跨過任何決策門檻就可以提早停止模擬；
+        # 有時間預算時，底池越大分到的時間越多，接近門檻的決策會一直算到期限
+        start_time = time.monotonic()
+        deadline = self.time_budget.deadline(pot_amount, my_stack) if self.time_budget else None
+        win_rate = self.estimate_win_rate(
+            my_hole_cards, community_cards, num_simulations=2000, num_opponents=max(1, num_opponents),
+            thresholds=[pot_odds, 0.65, 0.7, 0.75, 0.8], deadline=deadline, ranges=opponent_ranges,
+        )
+        if self.time_budget:
+            self.time_budget.record(time.monotonic() - start_time)
         
         self.log(f"Win Rate: {win_rate:.2f}, Pot Odds: {pot_odds:.2f}, Call Amount: {call_amount}, Min Raise: {min_raise}, Max Raise: {max_raise}, Pot Amount: {pot_amount}")
         
@@ -75,46 +103,82 @@ class DecisionPlayer(BasePokerPlayer):
         return self.fold_action()
 
     def receive_game_start_message(self, game_info):
-        pass
+        # 背景執行緒也會用到 memo，在遊戲開始時就建好，不要等第一次估計才建
+        self.equity_memo = EquityMemo(self.equity_estimator, cache=self.equity_cache)
+        self.time_budget = TimeBudget(self.GAME_SECONDS, game_info["rule"]["max_round"])
     
     def receive_round_start_message(self, round_count :int , hole_card : list, seats : list):
-        pass
+        self.hole_card = hole_card
+        self.range_trackers = {}
+        if self.time_budget:
+            self.time_budget.start_round(round_count)
 
     def receive_street_start_message(self, street, round_state):
-        pass
+        self.equity_memo.start_street()
+        self.precompute_win_rate(round_state)
 
     def receive_game_update_message(self, action, round_state):
-        pass
+        # 對手每下注一次，就依這個動作在各手牌下的可能性調整他的範圍
+        uuid = action["player_uuid"]
+        if uuid == self.uuid or self.range_trackers is None:
+            return
+        history = round_state["action_histories"].get(round_state["street"], [])
+        entry = next((h for h in reversed(history) if h.get("uuid") == uuid), {})
+        paid = entry.get("paid", 0)
+        pot = round_state["pot"]["main"]["amount"] + sum(side["amount"] for side in round_state["pot"]["side"])
+        community_cards = [Card.from_str(c) for c in round_state["community_card"]]
+        self.range_tracker(uuid).observe(action["action"], paid, pot - paid, community_cards)
     
     def receive_round_result_message(self, winners, hand_info, round_state):
-        pass
+        if self.equity_cache is not None:
+            self.equity_cache.flush()
     
-    def estimate_win_rate(self, my_hole_cards, community_cards, num_simulations=2000):
-        win = 0
-
-        for _ in range(num_simulations):
-            # 建立一副新的牌，移除已知的牌
-            deck = Deck()
-            known_cards = my_hole_cards + community_cards
-            deck.deck = [card for card in deck.deck if card not in known_cards]
-            deck.shuffle()
-
-            # 抽對手手牌與剩下的 community cards
-            opponent_hole = deck.draw_cards(2)
-            community_fill = 5 - len(community_cards)
-            full_community = community_cards + deck.draw_cards(community_fill)
-
-            # 評估雙方手牌強度
-            my_score = HandEvaluator.eval_hand(my_hole_cards, full_community)
-            opponent_score = HandEvaluator.eval_hand(opponent_hole, full_community)
-            
-            assert my_score is not None, "My hand evaluation failed"
-            assert opponent_score is not None, "Opponent hand evaluation failed"
-
-            if my_score > opponent_score:
-                win += 1
-        return win / num_simulations
+    def estimate_win_rate(self, my_hole_cards, community_cards, num_simulations=2000, num_opponents=1, thresholds=None, deadline=None, ranges=None, background=False):
+        # preflop 查表、小的情況窮舉，其餘抽樣估計；
+        # 同一條街再被問到同樣的牌面時沿用記住的結果，模擬次數會一直累積。
+        # 有對手範圍時，對手的手牌依範圍的權重抽樣，記住的結果也跟範圍綁在一起
+        return self.equity_memo.estimate(
+            my_hole_cards, community_cards, num_opponents, num_simulations, thresholds, deadline, background,
+            ranges,
+        )
     
+    def precompute_win_rate(self, round_state):
+        # 新的一條街一開始就在背景先跑模擬，輪到自己時只需要補足剩下的部分
+        # 自己已經蓋牌或全下時沒有決定要做，不要在背景跟其他玩家搶時間
+        if self.hole_card is None or self.my_state(round_state) != "participating":
+            return
+        my_hole_cards = [Card.from_str(c) for c in self.hole_card]
+        community_cards = [Card.from_str(c) for c in round_state['community_card']]
+        num_opponents = self.count_opponents(round_state)
+        self.start_background(
+            "win_rate", self.estimate_win_rate, my_hole_cards, community_cards, 2000, max(1, num_opponents),
+            ranges=self.opponent_ranges(round_state), background=True,
+        )
+
+    def range_tracker(self, uuid):
+        if uuid not in self.range_trackers:
+            self.range_trackers[uuid] = RangeTracker([Card.from_str(c) for c in self.hole_card or []])
+        return self.range_trackers[uuid]
+
+    def opponent_ranges(self, round_state):
+        # 還沒有對手加注過時回傳 None，照舊當作對手拿隨機的牌
+        trackers = [
+            self.range_tracker(player["uuid"]) for player in round_state["seats"]
+            if player["uuid"] != self.uuid and player["state"] != "folded"
+        ] if self.range_trackers is not None else []
+        if not any(tracker.narrowed for tracker in trackers):
+            return None
+        return [tracker.range() for tracker in trackers]
+
+    def my_state(self, round_state):
+        return next(player["state"] for player in round_state["seats"] if player["uuid"] == self.uuid)
+
+    def count_opponents(self, round_state):
+        return len([
+            player for player in round_state["seats"]
+            if player["uuid"] != self.uuid and player["state"] != "folded"
+        ])
+
     def get_expected_stack_if_fold_all(self, round_state):
         max_raiseound = 20
         current_round = round_state["round_count"]
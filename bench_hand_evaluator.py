@@ -0,0 +1,40 @@
+import argparse
+import random
+import time
+
+from game.engine.card import Card
+from game.engine.hand_evaluator import HandEvaluator
+
+
+def sample_hands(num_hands, seed):
+    rng = random.Random(seed)
+    hands = []
+    for _ in range(num_hands):
+        cards = [Card.from_id(cid) for cid in rng.sample(range(1, 53), 7)]
+        hands.append((cards[:2], cards[2:]))
+    return hands
+
+
+def time_implementation(implementation, hands):
+    HandEvaluator.set_implementation(implementation)
+    HandEvaluator.eval_hand(*hands[0])  # build lookup tables outside the timer
+    start = time.perf_counter()
+    scores = [HandEvaluator.eval_hand(hole, community) for hole, community in hands]
+    return time.perf_counter() - start, scores
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    hands = sample_hands(args.n, args.seed)
+    legacy_time, legacy_scores = time_implementation(HandEvaluator.IMPLEMENTATION_LEGACY, hands)
+    table_time, table_scores = time_implementation(HandEvaluator.IMPLEMENTATION_TABLE, hands)
+    HandEvaluator.set_implementation(HandEvaluator.IMPLEMENTATION_TABLE)
+
+    assert legacy_scores == table_scores, "table evaluator disagrees with legacy evaluator"
+    print(f"legacy: {legacy_time / args.n * 1e6:.2f} us/hand")
+    print(f"table : {table_time / args.n * 1e6:.2f} us/hand")
+    print(f"speedup: {legacy_time / table_time:.1f}x")
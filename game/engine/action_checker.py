@@ -2,13 +2,21 @@ from functools import reduce
 
 
 class ActionChecker:
+    """Checks and corrects actions against the bets made on the street.
+
+    The bet to match and the minimum raise come from the largest raise or
+    blind in the players' street histories. Callers that track them can pass
+    a bet_state from bet_state()/raised_bet_state() instead, which makes the
+    checks independent of the history length.
+    """
+
     @classmethod
-    def correct_action(self, players, player_pos, sb_amount, action, amount=None):
+    def correct_action(self, players, player_pos, sb_amount, action, amount=None, bet_state=None):
         if amount is not None:
             amount = round(amount) # ensure amount is an integer
         if self.is_allin(players[player_pos], action, amount):
             amount = players[player_pos].stack + players[player_pos].paid_sum()
-        elif self.__is_illegal(players, player_pos, sb_amount, action, amount):
+        elif self.__is_illegal(players, player_pos, sb_amount, action, amount, bet_state):
             action, amount = "fold", 0
         return action, amount
 
@@ -26,16 +34,49 @@ class ActionChecker:
         return amount - player.paid_sum()
 
     @classmethod
-    def agree_amount(self, players):
+    def agree_amount(self, players, bet_state=None):
+        if bet_state is not None:
+            return bet_state["agree_amount"]
         last_raise = self.__fetch_last_raise(players)
         return last_raise["amount"] if last_raise else 0
 
     @classmethod
-    def legal_actions(self, players, player_pos, sb_amount):
+    def bet_state(self, players, sb_amount):
+        """The bet to match, last raise size and minimum re-raise read from the histories."""
+        last_raise, raiser_pos = None, None
+        for pos, player in enumerate(players):
+            for history in player.action_histories:
+                if history["action"] in self.RAISE_ACTIONS and (
+                    last_raise is None or history["amount"] > last_raise["amount"]
+                ):
+                    last_raise, raiser_pos = history, pos
+        if last_raise is None:
+            return self.__gen_bet_state(0, 0, sb_amount * 2, None)
+        return self.__gen_bet_state(
+            last_raise["amount"],
+            last_raise["add_amount"],
+            last_raise["amount"] + last_raise["add_amount"],
+            raiser_pos,
+        )
+
+    @classmethod
+    def raised_bet_state(self, bet_state, player_pos, amount, add_amount):
+        """bet_state after the player at player_pos raised to amount by add_amount."""
+        # like __fetch_last_raise, keep the first largest raise in seat order
+        raiser_pos = bet_state["raiser_pos"]
+        is_last_raise = raiser_pos is None or amount > bet_state["agree_amount"] or (
+            amount == bet_state["agree_amount"] and player_pos < raiser_pos
+        )
+        if not is_last_raise:
+            return bet_state
+        return self.__gen_bet_state(amount, add_amount, amount + add_amount, player_pos)
+
+    @classmethod
+    def legal_actions(self, players, player_pos, sb_amount, bet_state=None):
         player = players[player_pos]
-        call_amount = self.agree_amount(players) # The total bet amount player needs to match to call
+        call_amount = self.agree_amount(players, bet_state) # The total bet amount player needs to match to call
         # Minimum amount for a raise that would fully re-open betting for previous actors
-        min_full_re_raise_amount = self.__min_raise_amount(players, sb_amount)
+        min_full_re_raise_amount = self.__min_raise_amount(players, sb_amount, bet_state)
         player_all_in_total_bet = player.stack + player.paid_sum() # Player's total bet if they go all-in
 
         # Determine actual min and max raise amounts
@@ -60,32 +101,45 @@ class ActionChecker:
         ]
 
     @classmethod
-    def _is_legal(self, players, player_pos, sb_amount, action, amount=None):
-        return not self.__is_illegal(players, player_pos, sb_amount, action, amount)
+    def _is_legal(self, players, player_pos, sb_amount, action, amount=None, bet_state=None):
+        return not self.__is_illegal(players, player_pos, sb_amount, action, amount, bet_state)
+
+    RAISE_ACTIONS = ["RAISE", "SMALLBLIND", "BIGBLIND"]
+
+    @classmethod
+    def __gen_bet_state(self, agree_amount, last_raise_amount, min_raise_amount, raiser_pos):
+        return {
+            "agree_amount": agree_amount,
+            "last_raise_amount": last_raise_amount,
+            "min_raise_amount": min_raise_amount,
+            "raiser_pos": raiser_pos,
+        }
 
     @classmethod
-    def __is_illegal(self, players, player_pos, sb_amount, action, amount=None):
+    def __is_illegal(self, players, player_pos, sb_amount, action, amount=None, bet_state=None):
         if action == "fold":
             return False
         elif action == "call":
             return self.__is_short_of_money(
                 players[player_pos], amount
-            ) or self.__is_illegal_call(players, amount)
+            ) or self.__is_illegal_call(players, amount, bet_state)
         elif action == "raise":
             return self.__is_short_of_money(
                 players[player_pos], amount
-            ) or self.__is_illegal_raise(players, amount, sb_amount)
+            ) or self.__is_illegal_raise(players, amount, sb_amount, bet_state)
 
     @classmethod
-    def __is_illegal_call(self, players, amount):
-        return amount != self.agree_amount(players)
+    def __is_illegal_call(self, players, amount, bet_state=None):
+        return amount != self.agree_amount(players, bet_state)
 
     @classmethod
-    def __is_illegal_raise(self, players, amount, sb_amount):
-        return self.__min_raise_amount(players, sb_amount) > amount
+    def __is_illegal_raise(self, players, amount, sb_amount, bet_state=None):
+        return self.__min_raise_amount(players, sb_amount, bet_state) > amount
 
     @classmethod
-    def __min_raise_amount(self, players, sb_amount):
+    def __min_raise_amount(self, players, sb_amount, bet_state=None):
+        if bet_state is not None:
+            return bet_state["min_raise_amount"]
         raise_ = self.__fetch_last_raise(players)
         return raise_["amount"] + raise_["add_amount"] if raise_ else sb_amount * 2
 
@@ -100,7 +154,7 @@ class ActionChecker:
         raise_histories = [
             h
             for h in all_histories
-            if h["action"] in ["RAISE", "SMALLBLIND", "BIGBLIND"]
+            if h["action"] in self.RAISE_ACTIONS
         ]
         if len(raise_histories) == 0:
             return None
@@ -1,5 +1,7 @@
 class Card:
 
+    __slots__ = ("suit", "rank", "_id", "_str")
+
     CLUB = 2
     DIAMOND = 4
     HEART = 8
@@ -23,41 +25,69 @@ class Card:
         14: "A",
     }
 
-    def __init__(self, suit, rank):
-        self.suit = suit
-        self.rank = 14 if rank == 1 else rank
+    # The 52 cards are created once below; every constructor returns one of them.
+    __by_suit_rank = {}
+    __by_id = {}
+    __by_str = {}
+
+    def __new__(cls, suit, rank):
+        rank = 14 if rank == 1 else rank
+        card = cls.__by_suit_rank.get((suit, rank))
+        if card is None:
+            raise ValueError(cls.__unknown_card_msg % (suit, rank))
+        return card
+
+    def __setattr__(self, name, value):
+        raise AttributeError(self.__immutable_msg)
+
+    def __delattr__(self, name):
+        raise AttributeError(self.__immutable_msg)
 
     def __eq__(self, other):
-        return self.suit == other.suit and self.rank == other.rank
+        return self is other or (
+            isinstance(other, Card) and self.suit == other.suit and self.rank == other.rank
+        )
+
+    def __hash__(self):
+        return self._id
+
+    def __reduce__(self):
+        return (Card.from_id, (self._id,))
 
     def __str__(self):
-        suit = self.SUIT_MAP[self.suit]
-        rank = self.RANK_MAP[self.rank]
-        return "{0}{1}".format(suit, rank)
+        return self._str
 
     def to_id(self):
-        rank = 1 if self.rank == 14 else self.rank
-        num = 0
-        tmp = self.suit >> 1
-        while tmp & 1 != 1:
-            num += 1
-            tmp >>= 1
-
-        return rank + 13 * num
+        return self._id
 
     @classmethod
     def from_id(cls, card_id):
-        suit, rank = 2, card_id
-        while rank > 13:
-            suit <<= 1
-            rank -= 13
-
-        return cls(suit, rank)
+        return cls.__by_id[card_id]
 
     @classmethod
     def from_str(cls, str_card):
         assert len(str_card) == 2
-        inverse = lambda hsh: {v: k for k, v in hsh.items()}
-        suit = inverse(cls.SUIT_MAP)[str_card[0].upper()]
-        rank = inverse(cls.RANK_MAP)[str_card[1]]
-        return cls(suit, rank)
+        card = cls.__by_str.get(str_card)
+        if card is None:
+            card = cls.__by_str[str_card[0].upper() + str_card[1]]
+        return card
+
+    @classmethod
+    def _intern_all(cls):
+        for num, suit in enumerate([cls.CLUB, cls.DIAMOND, cls.HEART, cls.SPADE]):
+            for id_rank in range(1, 14):
+                card = object.__new__(cls)
+                rank = 14 if id_rank == 1 else id_rank
+                object.__setattr__(card, "suit", suit)
+                object.__setattr__(card, "rank", rank)
+                object.__setattr__(card, "_id", id_rank + 13 * num)
+                object.__setattr__(card, "_str", cls.SUIT_MAP[suit] + cls.RANK_MAP[rank])
+                cls.__by_suit_rank[(suit, rank)] = card
+                cls.__by_id[card._id] = card
+                cls.__by_str[card._str] = card
+
+    __unknown_card_msg = "Unknown card (suit = %s, rank = %s)"
+    __immutable_msg = "Card objects are shared and cannot be modified"
+
+
+Card._intern_all()
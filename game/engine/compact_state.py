@@ -0,0 +1,289 @@
+from game.engine.card import Card
+from game.engine.hand_evaluator import HandEvaluator
+from game.engine.pay_info import PayInfo
+from game.engine.player import Player
+from game.engine.poker_constants import PokerConstants as Const
+from game.engine.round_manager import RoundManager
+from game.engine.table import Table
+
+
+class CompactState:
+    """One round as flat per-seat lists, with apply(action) and undo() for search.
+
+    Follows the rules of ActionChecker and RoundManager: the same action
+    corrections, the same end-of-street test, board cards dealt from the end
+    of the deck, and the same side pots and prize split at showdown. Instead
+    of per-player history dicts it keeps, per seat, the chips paid this
+    street (paid), this round (totals), the pay status, the number of
+    history entries this street (acts) and the last of them (last_action),
+    plus the bet to match, the last raise size and its seat.
+
+    apply() records the fields it is about to change, so undo() restores the
+    previous state exactly. Build one with from_state() from a RoundManager
+    state; to_state() turns it back into one by replaying the applied actions
+    on a copy of that state.
+    """
+
+    __slots__ = (
+        "round_count", "sb_amount", "sb_pos", "street", "next_player",
+        "deck", "deck_top", "board", "hole_ids",
+        "stacks", "paid", "totals", "status", "acts", "last_action",
+        "bet", "raise_add", "raiser",
+        "_base", "_log", "_trail",
+    )
+
+    NOT_FOUND = -1
+    NO_ACTION = -1
+
+    @classmethod
+    def from_state(self, state):
+        table = state["table"]
+        players = table.seats.players
+        compact = self()
+        compact.round_count = state["round_count"]
+        compact.sb_amount = state["small_blind_amount"]
+        compact.sb_pos = table.sb_pos()
+        compact.street = state["street"]
+        compact.next_player = (
+            state["next_player"] if state["next_player"] != Table._player_not_found else self.NOT_FOUND
+        )
+        compact.deck = [card.to_id() for card in table.deck.deck]
+        compact.deck_top = len(compact.deck)
+        compact.board = [card.to_id() for card in table.get_community_card()]
+        compact.hole_ids = [[card.to_id() for card in p.hole_card] for p in players]
+        compact.stacks = [p.stack for p in players]
+        compact.paid = [p.paid_sum() for p in players]
+        compact.totals = [p.pay_info.amount for p in players]
+        compact.status = [p.pay_info.status for p in players]
+        compact.acts = [len(p.action_histories) for p in players]
+        compact.last_action = [
+            self.ACTION_CODES[p.action_histories[-1]["action"]] if p.action_histories else self.NO_ACTION
+            for p in players
+        ]
+        compact.bet, compact.raise_add, compact.raiser = 0, 0, self.NOT_FOUND
+        for pos, player in enumerate(players):
+            for history in player.action_histories:
+                if history["action"] in self.RAISE_ACTIONS and history["amount"] > compact.bet:
+                    compact.bet, compact.raise_add = history["amount"], history["add_amount"]
+                    compact.raiser = pos
+        compact._base = {
+            key: value for key, value in state.items() if key != "table"
+        }
+        compact._base["table"] = table.serialize()
+        compact._log = []
+        compact._trail = []
+        return compact
+
+    def to_state(self):
+        state = dict(self._base)
+        state["table"] = Table.deserialize(self._base["table"])
+        for action, amount in self._log:
+            state, _ = RoundManager.apply_action(state, action, amount, copy_state=False)
+        return state
+
+    def is_finished(self):
+        return self.street == Const.Street.FINISHED
+
+    def min_raise(self):
+        return self.bet + self.raise_add if self.raiser != self.NOT_FOUND else self.sb_amount * 2
+
+    def legal_actions(self):
+        pos = self.next_player
+        all_in = self.stacks[pos] + self.paid[pos]
+        min_raise = max_raise = -1
+        if all_in > self.bet:
+            min_raise = self.min_raise() if all_in >= self.min_raise() else all_in
+            max_raise = all_in
+        return [
+            {"action": "fold", "amount": 0},
+            {"action": "call", "amount": self.bet},
+            {"action": "raise", "amount": {"min": min_raise, "max": max_raise}},
+        ]
+
+    def apply(self, action, amount=0):
+        if action not in ["fold", "call", "raise"]:
+            raise ValueError("Unexpected action %s received" % action)
+        self._trail.append((
+            self.street, self.next_player, self.deck_top, len(self.board),
+            self.bet, self.raise_add, self.raiser,
+            self.stacks[:], self.paid[:], self.totals[:], self.status[:],
+            self.acts[:], self.last_action[:],
+        ))
+        self._log.append((action, amount))
+        pos = self.next_player
+        action, amount = self.__correct_action(pos, action, amount)
+        if action == "fold":
+            self.status[pos] = PayInfo.FOLDED
+            self.__add_history(pos, Const.Action.FOLD)
+        else:
+            if self.__is_allin(pos, action, amount):
+                self.status[pos] = PayInfo.ALLIN
+            self.__pay(pos, amount - self.paid[pos])
+            self.paid[pos] = amount
+            if action == "call":
+                self.__add_history(pos, Const.Action.CALL)
+            else:
+                self.__add_history(pos, Const.Action.RAISE)
+                self.__raise_to(pos, amount, amount - self.bet)
+        if self.__is_everyone_agreed():
+            self.__clear_street_histories()
+            self.street += 1
+            self.__start_street()
+        else:
+            self.next_player = self.__next_waiting(self.next_player)
+
+    def undo(self):
+        (self.street, self.next_player, self.deck_top, board_size,
+         self.bet, self.raise_add, self.raiser,
+         self.stacks, self.paid, self.totals, self.status,
+         self.acts, self.last_action) = self._trail.pop()
+        del self.board[board_size:]
+        self._log.pop()
+
+    """ private """
+
+    ACTION_CODES = {
+        Player.ACTION_FOLD_STR: Const.Action.FOLD,
+        Player.ACTION_CALL_STR: Const.Action.CALL,
+        Player.ACTION_RAISE_STR: Const.Action.RAISE,
+        Player.ACTION_SMALL_BLIND: Const.Action.SMALL_BLIND,
+        Player.ACTION_BIG_BLIND: Const.Action.BIG_BLIND,
+        Player.ACTION_ANTE: Const.Action.ANTE,
+    }
+    RAISE_ACTIONS = [Player.ACTION_RAISE_STR, Player.ACTION_SMALL_BLIND, Player.ACTION_BIG_BLIND]
+
+    def __correct_action(self, pos, action, amount):
+        if amount is not None:
+            amount = round(amount)
+        if self.__is_allin(pos, action, amount):
+            return action, self.stacks[pos] + self.paid[pos]
+        if action == "fold":
+            return action, amount
+        short = self.stacks[pos] < amount - self.paid[pos]
+        if action == "call" and not short and amount == self.bet:
+            return action, amount
+        if action == "raise" and not short and amount >= self.min_raise():
+            return action, amount
+        return "fold", 0
+
+    def __is_allin(self, pos, action, amount):
+        if action == "call":
+            return amount >= self.stacks[pos] + self.paid[pos]
+        if action == "raise":
+            return amount == self.stacks[pos] + self.paid[pos]
+        return False
+
+    def __pay(self, pos, amount):
+        if self.stacks[pos] < amount:
+            raise ValueError(self.__collect_err_msg % (amount, self.stacks[pos]))
+        self.stacks[pos] -= amount
+        self.totals[pos] += amount
+
+    def __add_history(self, pos, action):
+        self.acts[pos] += 1
+        self.last_action[pos] = action
+
+    def __raise_to(self, pos, amount, add_amount):
+        # ActionChecker takes the first largest raise in seat order, then history order
+        if amount > self.bet or (amount == self.bet and pos < self.raiser):
+            self.bet, self.raise_add, self.raiser = amount, add_amount, pos
+
+    def __next_waiting(self, start_pos):
+        num_players = len(self.status)
+        for offset in range(1, num_players + 1):
+            pos = (start_pos + offset) % num_players
+            if self.status[pos] == PayInfo.PAY_TILL_END:
+                return pos
+        return self.NOT_FOUND
+
+    def __is_everyone_agreed(self):
+        next_pos = self.__next_waiting(self.next_player)
+        max_pay = max(self.paid)
+        everyone_agreed = all(self.__is_agreed(pos, max_pay) for pos in range(len(self.status)))
+        lonely_player = sum(status != PayInfo.FOLDED for status in self.status) == 1
+        no_need_to_ask = (
+            self.status.count(PayInfo.PAY_TILL_END) == 1
+            and next_pos != self.NOT_FOUND
+            and self.paid[next_pos] == max_pay
+        )
+        return everyone_agreed or lonely_player or no_need_to_ask
+
+    def __is_agreed(self, pos, max_pay):
+        if self.status[pos] in [PayInfo.FOLDED, PayInfo.ALLIN]:
+            return True
+        # BigBlind should be asked action at least once
+        bb_ask_once = (
+            self.street == Const.Street.PREFLOP
+            and self.acts[pos] == 1
+            and self.last_action[pos] == Const.Action.BIG_BLIND
+        )
+        return not bb_ask_once and self.paid[pos] == max_pay and self.acts[pos] != 0
+
+    def __clear_street_histories(self):
+        num_players = len(self.status)
+        self.paid = [0] * num_players
+        self.acts = [0] * num_players
+        self.last_action = [self.NO_ACTION] * num_players
+        self.bet, self.raise_add, self.raiser = 0, 0, self.NOT_FOUND
+
+    def __start_street(self):
+        while True:
+            self.next_player = self.__next_waiting(self.sb_pos - 1)
+            if self.street == Const.Street.PREFLOP:
+                for _ in range(2):
+                    self.next_player = self.__next_waiting(self.next_player)
+            elif self.street == Const.Street.FLOP:
+                self.__deal(3)
+            elif self.street in [Const.Street.TURN, Const.Street.RIVER]:
+                self.__deal(1)
+            elif self.street == Const.Street.SHOWDOWN:
+                self.__showdown()
+                self.street += 1
+                return
+            else:
+                raise ValueError("Street is already finished [street = %d]" % self.street)
+            if self.status.count(PayInfo.PAY_TILL_END) > 1:
+                return
+            self.street += 1
+
+    def __deal(self, num_cards):
+        for _ in range(num_cards):
+            self.deck_top -= 1
+            self.board.append(self.deck[self.deck_top])
+
+    def __showdown(self):
+        board = HandEvaluator.board_context([Card.from_id(cid) for cid in self.board])
+        scores = [
+            board.eval_hole([Card.from_id(cid) for cid in hole]) if status != PayInfo.FOLDED else None
+            for hole, status in zip(self.hole_ids, self.status)
+        ]
+        prizes = [0] * len(self.status)
+        for amount, eligibles in self.__pots():
+            contenders = [pos for pos in eligibles if scores[pos] is not None]
+            best = max(scores[pos] for pos in contenders)
+            winners = [pos for pos in contenders if scores[pos] == best]
+            for pos in winners:
+                prizes[pos] += int(amount / len(winners))
+        for pos, prize in enumerate(prizes):
+            self.stacks[pos] += prize
+
+    def __pots(self):
+        # same split as GameEvaluator.create_pot: one side pot per all-in
+        # amount, smallest first, then the main pot for the largest payers
+        pots = []
+        allin_amounts = sorted(
+            total for total, status in zip(self.totals, self.status) if status == PayInfo.ALLIN
+        )
+        for allin_amount in allin_amounts:
+            amount = sum(min(allin_amount, total) for total in self.totals) - sum(pot[0] for pot in pots)
+            eligibles = [
+                pos for pos, total in enumerate(self.totals)
+                if total >= allin_amount and self.status[pos] != PayInfo.FOLDED
+            ]
+            pots.append((amount, eligibles))
+        max_pay = max(self.totals)
+        main_amount = sum(self.totals) - sum(pot[0] for pot in pots)
+        pots.append((main_amount, [pos for pos, total in enumerate(self.totals) if total == max_pay]))
+        return pots
+
+    __collect_err_msg = "Failed to collect %d chips. Because he has only %d chips"
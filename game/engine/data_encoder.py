@@ -1,3 +1,5 @@
+import weakref
+from bisect import bisect_left, insort
 from functools import reduce
 
 from game.engine.pay_info import PayInfo
@@ -6,11 +8,22 @@ from game.engine.game_evaluator import GameEvaluator
 
 
 class DataEncoder:
+    """Encodes engine objects into the dicts sent to the players.
+
+    Seats and action histories are encoded incrementally: the encoding of a
+    Seats or Table is kept between calls, and only the players whose stack or
+    state changed and the history entries added since the last call are
+    encoded again. Lists already returned are never modified; a changed
+    list is replaced by a new one.
+    """
 
     PAY_INFO_PAY_TILL_END_STR = "participating"
     PAY_INFO_ALLIN_STR = "allin"
     PAY_INFO_FOLDED_STR = "folded"
 
+    _seat_encodings = weakref.WeakKeyDictionary()
+    _history_encodings = weakref.WeakKeyDictionary()
+
     @classmethod
     def encode_player(self, player, holecard=False):
         hash_ = {
@@ -26,7 +39,25 @@ class DataEncoder:
 
     @classmethod
     def encode_seats(self, seats):
-        return {"seats": [self.encode_player(player) for player in seats.players]}
+        players = seats.players
+        cached = self._seat_encodings.get(seats)
+        if cached is None or len(cached.players) != len(players) or any(
+            a is not b for a, b in zip(cached.players, players)
+        ):
+            cached = _SeatEncoding(players, [self.encode_player(player) for player in players])
+            self._seat_encodings[seats] = cached
+            return {"seats": cached.encoded}
+        changed = [
+            pos for pos, (player, encoded) in enumerate(zip(players, cached.encoded))
+            if player.stack != encoded["stack"]
+            or self.__payinfo_to_str(player.pay_info.status) != encoded["state"]
+            or player.name != encoded["name"]
+        ]
+        if changed:
+            cached.encoded = cached.encoded[::]
+            for pos in changed:
+                cached.encoded[pos] = self.encode_player(players[pos])
+        return {"seats": cached.encoded}
 
     @classmethod
     def encode_pot(self, players):
@@ -77,23 +108,23 @@ class DataEncoder:
 
     @classmethod
     def encode_action_histories(self, table):
-        all_street_histories = [
-            [player.round_action_histories[street] for player in table.seats.players]
-            for street in range(4)
-        ]
-        past_street_histories = [
-            histories
-            for histories in all_street_histories
-            if any([e is not None for e in histories])
-        ]
-        current_street_histories = [
-            player.action_histories for player in table.seats.players
-        ]
-        street_histories = past_street_histories + [current_street_histories]
-        street_histories = [
-            self.__order_histories(table.sb_pos(), histories)
-            for histories in street_histories
-        ]
+        players = table.seats.players
+        sb_pos = table.sb_pos()
+        cached = self._history_encodings.get(table)
+        if cached is None or cached.sb_pos != sb_pos or len(cached.players) != len(players) or any(
+            a is not b for a, b in zip(cached.players, players)
+        ):
+            cached = _HistoryEncoding(players, sb_pos)
+            self._history_encodings[table] = cached
+        street_histories = []
+        for street in range(4):
+            lists = [player.round_action_histories[street] for player in players]
+            if all(e is None for e in lists):
+                continue
+            if cached.past[street] is None or any(a is not b for a, b in zip(cached.past[street][0], lists)):
+                cached.past[street] = (lists, self.__order_histories(sb_pos, lists))
+            street_histories.append(cached.past[street][1])
+        street_histories.append(self.__sync_current_histories(cached, players))
         street_name = ["preflop", "flop", "turn", "river"]
         action_histories = {
             name: histories for name, histories in zip(street_name, street_histories)
@@ -149,6 +180,32 @@ class DataEncoder:
     def __encode_players(self, players):
         return [self.encode_player(player) for player in players]
 
+    @classmethod
+    def __sync_current_histories(self, cached, players):
+        lists = [player.action_histories for player in players]
+        if cached.current is None or any(a is not b for a, b in zip(cached.current, lists)):
+            cached.start_street(lists)
+        num_players = len(players)
+        for pos, histories in enumerate(lists):
+            # rank in the seat order that starts from the small blind
+            rank = (pos - cached.sb_pos) % num_players
+            for level in range(cached.synced[pos], len(histories)):
+                # the zip order puts the k-th entries of all players after
+                # every earlier entry, and orders them by rank
+                if level == len(cached.levels):
+                    cached.levels.append([])
+                index = sum(len(ranks) for ranks in cached.levels[:level]) + bisect_left(
+                    cached.levels[level], rank
+                )
+                if cached.published:
+                    cached.ordered = cached.ordered[::]
+                    cached.published = False
+                cached.ordered.insert(index, histories[level])
+                insort(cached.levels[level], rank)
+            cached.synced[pos] = len(histories)
+        cached.published = True
+        return cached.ordered
+
     @classmethod
     def __order_histories(self, start_pos, player_histories):
         ordered_player_histories = [
@@ -170,3 +227,26 @@ class DataEncoder:
         for _ in range(max_len - len(lst)):
             lst.append(None)
         return lst
+
+
+class _SeatEncoding:
+    def __init__(self, players, encoded):
+        self.players = players[::]
+        self.encoded = encoded
+
+
+class _HistoryEncoding:
+    def __init__(self, players, sb_pos):
+        self.players = players[::]
+        self.sb_pos = sb_pos
+        # per street, the saved history lists and their ordered encoding
+        self.past = [None] * 4
+        self.current = None
+
+    def start_street(self, lists):
+        self.current = lists
+        self.synced = [0] * len(lists)
+        # ranks of the players that have a k-th entry, per k
+        self.levels = []
+        self.ordered = []
+        self.published = False
@@ -18,6 +18,7 @@ class Dealer:
         self.message_summarizer = MessageSummarizer(verbose=0)
         self.table = Table()
         self.blind_structure = {}
+        self.copy_state = False
 
     def register_player(self, player_name, algorithm):
         self.__config_check()
@@ -47,13 +48,15 @@ class Dealer:
 
     def play_round(self, round_count, blind_amount, ante, table):
         state, msgs = RoundManager.start_new_round(
-            round_count, blind_amount, ante, table
+            round_count, blind_amount, ante, table, self.copy_state
         )
         while True:
             self.__message_check(msgs, state["street"])
             if state["street"] != Const.Street.FINISHED:  # continue the round
                 action, bet_amount = self.__publish_messages(msgs)
-                state, msgs = RoundManager.apply_action(state, action, bet_amount)
+                state, msgs = RoundManager.apply_action(
+                    state, action, bet_amount, self.copy_state
+                )
             else:  # finish the round after publish round result
                 self.__publish_messages(msgs)
                 break
@@ -69,6 +72,9 @@ class Dealer:
     def set_blind_structure(self, blind_structure):
         self.blind_structure = blind_structure
 
+    def set_copy_state(self, copy_state):
+        self.copy_state = copy_state
+
     def __update_forced_bet_amount(self, ante, sb_amount, round_count, blind_structure):
         if round_count in blind_structure:
             update_info = blind_structure[round_count]
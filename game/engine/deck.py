@@ -1,5 +1,3 @@
-from functools import reduce
-
 from game.engine.card import Card
 import random
 
@@ -16,7 +14,7 @@ class Deck:
         return self.deck.pop()
 
     def draw_cards(self, num):
-        return reduce(lambda acc, _: acc + [self.draw_card()], range(num), [])
+        return [self.draw_card() for _ in range(num)]
 
     def size(self):
         return len(self.deck)
@@ -9,15 +9,12 @@ from game.engine.pay_info import PayInfo
 class GameEvaluator:
     @classmethod
     def judge(self, table):
-        winners = self.__find_winners_from(
-            table.get_community_card(), table.seats.players
-        )
+        board = HandEvaluator.board_context(table.get_community_card())
+        winners = self.__find_winners_from(board, table.seats.players)
         hand_info = self.__gen_hand_info_if_needed(
             table.seats.players, table.get_community_card()
         )
-        prize_map = self.__calc_prize_distribution(
-            table.get_community_card(), table.seats.players
-        )
+        prize_map = self.__calc_prize_distribution(board, table.seats.players)
         return winners, hand_info, prize_map
 
     @classmethod
@@ -27,11 +24,11 @@ class GameEvaluator:
         return side_pots + [main_pot]
 
     @classmethod
-    def __calc_prize_distribution(self, community_card, players):
+    def __calc_prize_distribution(self, board, players):
         prize_map = self.__create_prize_map(len(players))
         pots = self.create_pot(players)
         for pot in pots:
-            winners = self.__find_winners_from(community_card, pot["eligibles"])
+            winners = self.__find_winners_from(board, pot["eligibles"])
             prize = int(pot["amount"] / len(winners))
             for winner in winners:
                 prize_map[players.index(winner)] += prize
@@ -46,10 +43,8 @@ class GameEvaluator:
         return reduce(update, [{i: 0} for i in range(player_num)], {})
 
     @classmethod
-    def __find_winners_from(self, community_card, players):
-        score_player = lambda player: HandEvaluator.eval_hand(
-            player.hole_card, community_card
-        )
+    def __find_winners_from(self, board, players):
+        score_player = lambda player: board.eval_hole(player.hole_card)
 
         active_players = [player for player in players if player.is_active()]
         scores = [score_player(player) for player in active_players]
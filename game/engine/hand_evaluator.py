@@ -1,5 +1,7 @@
 from functools import reduce
-from itertools import groupby
+from itertools import groupby, combinations_with_replacement
+
+import numpy as np
 
 
 class HandEvaluator:
@@ -26,6 +28,26 @@ class HandEvaluator:
         STRAIGHTFLASH: "STRAIGHTFLASH",
     }
 
+    IMPLEMENTATION_TABLE = "table"
+    IMPLEMENTATION_LEGACY = "legacy"
+    implementation = IMPLEMENTATION_TABLE
+
+    # rank r contributes 5^(r-2) so that the key is the base-5 rank histogram
+    RANK_KEY = [0, 0] + [5 ** (rank - 2) for rank in range(2, 15)]
+    # suit counts are packed into one nibble per suit (CLUB, DIAMOND, HEART, SPADE)
+    SUIT_KEY = [0, 0, 1, 0, 1 << 4, 0, 0, 0, 1 << 8] + [0] * 7 + [1 << 12]
+    WHEEL_MASK = (1 << 14) | (1 << 2) | (1 << 3) | (1 << 4) | (1 << 5)
+
+    _rank_table = None
+    _flush_table = None
+    _batch_tables = None
+
+    @classmethod
+    def set_implementation(self, implementation):
+        if implementation not in [self.IMPLEMENTATION_TABLE, self.IMPLEMENTATION_LEGACY]:
+            raise ValueError("Unknown hand evaluator implementation [%s]" % implementation)
+        HandEvaluator.implementation = implementation
+
     @classmethod
     def gen_hand_rank_info(self, hole, community):
         hand = self.eval_hand(hole, community)
@@ -48,11 +70,172 @@ class HandEvaluator:
 
     @classmethod
     def eval_hand(self, hole, community):
-        ranks = sorted([card.rank for card in hole])
+        if self.implementation == self.IMPLEMENTATION_TABLE:
+            return self.__eval_hand_table(hole + community)
         # hole_flg = ranks[1] << 4 | ranks[0] # we now do not need to consider hole cards separately
         hand_flg = self.__calc_hand_info_flg(hole, community)
         return hand_flg
 
+    @classmethod
+    def board_context(self, community):
+        if HandEvaluator._rank_table is None:
+            self.__build_lookup_tables()
+        return BoardContext(community)
+
+    @classmethod
+    def eval_hands_batch(self, card_ids):
+        """Score an (N, k<=7) array of Card.to_id ids, one hand per row."""
+        if HandEvaluator._batch_tables is None:
+            self.__build_batch_tables()
+        id_rank_key, id_suit_key, id_rank_bit, id_suit, keys, values, flush_table = (
+            HandEvaluator._batch_tables
+        )
+        card_ids = np.asarray(card_ids, dtype=np.intp)
+        rank_key = id_rank_key[card_ids].sum(axis=1)
+        scores = values[np.searchsorted(keys, rank_key)]
+        suit_key = id_suit_key[card_ids].sum(axis=1)
+        flush_rows = np.nonzero((suit_key + 0x3333) & 0x8888)[0]
+        if len(flush_rows):
+            flush_ids = card_ids[flush_rows]
+            flush_bits, flush_suits = id_rank_bit[flush_ids], id_suit[flush_ids]
+            flush_scores = np.zeros(len(flush_rows), dtype=np.int64)
+            for suit in range(4):
+                mask = np.where(flush_suits == suit, flush_bits, 0).sum(axis=1)
+                flush_scores = np.maximum(flush_scores, flush_table[mask])
+            scores[flush_rows] = np.maximum(scores[flush_rows], flush_scores)
+        return scores
+
+    @classmethod
+    def __build_batch_tables(self):
+        if HandEvaluator._rank_table is None:
+            self.__build_lookup_tables()
+        # index 0 is unused so that Card.to_id values (1..52) index directly
+        id_rank = np.array([0] + [(cid - 1) % 13 + 1 for cid in range(1, 53)])
+        id_rank[id_rank == 1] = 14
+        id_suit = np.array([0] + [(cid - 1) // 13 for cid in range(1, 53)])
+        id_rank_key = np.array([self.RANK_KEY[rank] for rank in id_rank], dtype=np.int64)
+        id_rank_key[0] = 0
+        id_suit_key = (1 << (4 * id_suit)).astype(np.int64)
+        id_suit_key[0] = 0
+        id_rank_bit = (1 << id_rank).astype(np.int64)
+        id_rank_bit[0] = 0
+        keys = np.array(sorted(HandEvaluator._rank_table), dtype=np.int64)
+        values = np.array([HandEvaluator._rank_table[k] for k in keys], dtype=np.int64)
+        flush_table = np.array(HandEvaluator._flush_table, dtype=np.int64)
+        HandEvaluator._batch_tables = (
+            id_rank_key, id_suit_key, id_rank_bit, id_suit, keys, values, flush_table
+        )
+
+    @classmethod
+    def __eval_hand_table(self, cards):
+        if HandEvaluator._rank_table is None:
+            self.__build_lookup_tables()
+        rank_keys, suit_keys = self.RANK_KEY, self.SUIT_KEY
+        rank_key = suit_key = 0
+        for card in cards:
+            rank_key += rank_keys[card.rank]
+            suit_key += suit_keys[card.suit]
+        score = HandEvaluator._rank_table[rank_key]
+        # a nibble holding 5..7 cards overflows into its top bit once 3 is added
+        if (suit_key + 0x3333) & 0x8888:
+            flush_suit = self.__flush_suit(suit_key)
+            mask = 0
+            for card in cards:
+                if card.suit == flush_suit:
+                    mask |= 1 << card.rank
+            score = max(score, HandEvaluator._flush_table[mask])
+        return score
+
+    @classmethod
+    def __flush_suit(self, suit_key):
+        for suit in [2, 4, 8, 16]:
+            if (suit_key // self.SUIT_KEY[suit]) & 15 >= 5:
+                return suit
+
+    @classmethod
+    def __build_lookup_tables(self):
+        # Scores are derived with the same rules as the category-by-category
+        # evaluation below, so both implementations return identical flags.
+        rank_table = {}
+        for num in range(8):
+            for ranks in combinations_with_replacement(range(14, 1, -1), num):
+                if any(ranks.count(rank) > 4 for rank in set(ranks)):
+                    continue
+                key = sum(self.RANK_KEY[rank] for rank in ranks)
+                rank_table[key] = self.__score_ranks(list(ranks))
+        flush_table = [0] * (1 << 15)
+        for mask in range(1 << 15):
+            if mask & 3 == 0 and 5 <= bin(mask).count("1") <= 7:
+                flush_table[mask] = self.__score_flush_mask(mask)
+        HandEvaluator._flush_table = flush_table
+        HandEvaluator._rank_table = rank_table
+
+    @classmethod
+    def __score_ranks(self, ranks):
+        # ranks are sorted in descending order and may contain duplicates
+        counts = {rank: ranks.count(rank) for rank in set(ranks)}
+        fours = [rank for rank in counts if counts[rank] >= 4]
+        if fours:
+            four_rank = min(fours)
+            kicker = max([rank for rank in ranks if rank != four_rank], default=0)
+            return self.FOURCARD | (four_rank << 16) | (kicker << 12)
+
+        threes = [rank for rank in counts if counts[rank] >= 3]
+        pairs = [rank for rank in counts if counts[rank] >= 2 and rank not in threes]
+        if len(threes) == 2:
+            pairs.append(min(threes))
+        if threes and pairs:
+            return self.FULLHOUSE | (max(threes) << 16) | (max(pairs) << 12)
+
+        straight_rank = self.__straight_rank(reduce(lambda m, r: m | 1 << r, ranks, 0))
+        if straight_rank != -1:
+            return self.STRAIGHT | (straight_rank << 16)
+
+        if threes:
+            three_rank = max(threes)
+            kickers = [rank for rank in ranks if rank != three_rank][:2]
+            return self.THREECARD | (three_rank << 16) | self.__pack_ranks(kickers, 12)
+
+        pair_ranks = sorted(
+            [rank for rank in counts for _ in range(counts[rank] - 1)], reverse=True
+        )[:2]
+        if len(pair_ranks) == 2:
+            kicker = max([rank for rank in ranks if rank not in pair_ranks], default=0)
+            return self.TWOPAIR | (pair_ranks[0] << 16) | (pair_ranks[1] << 12) | (kicker << 8)
+
+        pair_rank = max([rank for rank in counts if counts[rank] >= 2], default=0)
+        kickers = [rank for rank in ranks if rank != pair_rank][:3]
+        onepair = (pair_rank << 16) | self.__pack_ranks(kickers, 12)
+        if onepair != 0:
+            return self.ONEPAIR | onepair
+        return self.HIGHCARD | self.__pack_ranks(ranks[:5], 16)
+
+    @classmethod
+    def __score_flush_mask(self, mask):
+        straight_rank = self.__straight_rank(mask)
+        if straight_rank != -1:
+            return self.STRAIGHTFLASH | (straight_rank << 16)
+        ranks = [rank for rank in range(14, 1, -1) if mask >> rank & 1][:5]
+        return self.FLASH | self.__pack_ranks(ranks, 16)
+
+    @classmethod
+    def __straight_rank(self, mask):
+        rank = -1
+        for r in range(2, 15):
+            if (mask >> r) & 0x1F == 0x1F:
+                rank = r + 4
+        # the wheel check runs last, exactly like __search_straight
+        if mask & self.WHEEL_MASK == self.WHEEL_MASK:
+            rank = 5
+        return rank
+
+    @classmethod
+    def __pack_ranks(self, ranks, top_shift):
+        result = 0
+        for i, rank in enumerate(ranks):
+            result |= rank << (top_shift - 4 * i)
+        return result
+
     @classmethod
     def __calc_hand_info_flg(self, hole, community):
         cards = hole + community
@@ -301,3 +484,44 @@ class HandEvaluator:
     def __mask_hand_rank_5(self, bit):
         mask = 15
         return bit & mask
+
+
+class BoardContext:
+    """Community cards analysed once, so each 2-card hole is scored incrementally."""
+
+    __slots__ = ("community", "rank_key", "suit_counts", "flush_draws")
+
+    def __init__(self, community):
+        self.community = community
+        self.rank_key = sum(HandEvaluator.RANK_KEY[card.rank] for card in community)
+        self.suit_counts = {2: 0, 4: 0, 8: 0, 16: 0}
+        suit_masks = {2: 0, 4: 0, 8: 0, 16: 0}
+        for card in community:
+            self.suit_counts[card.suit] += 1
+            suit_masks[card.suit] |= 1 << card.rank
+        # only a suit with 3+ board cards can still become a flush with two hole cards
+        self.flush_draws = [
+            (suit, count, suit_masks[suit])
+            for suit, count in self.suit_counts.items()
+            if count >= 3
+        ]
+
+    def eval_hole(self, hole):
+        if HandEvaluator.implementation != HandEvaluator.IMPLEMENTATION_TABLE:
+            return HandEvaluator.eval_hand(hole, self.community)
+        card1, card2 = hole
+        rank_keys = HandEvaluator.RANK_KEY
+        score = HandEvaluator._rank_table[
+            self.rank_key + rank_keys[card1.rank] + rank_keys[card2.rank]
+        ]
+        for suit, count, mask in self.flush_draws:
+            for card in hole:
+                if card.suit == suit:
+                    count += 1
+                    mask |= 1 << card.rank
+            if count >= 5:
+                score = max(score, HandEvaluator._flush_table[mask])
+        return score
+
+    def eval_holes(self, holes):
+        return [self.eval_hole(hole) for hole in holes]
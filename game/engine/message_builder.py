@@ -3,6 +3,13 @@ from game.engine.action_checker import ActionChecker
 
 
 class MessageBuilder:
+    """Builds the messages RoundManager sends to the players.
+
+    Methods that take round_state reuse an encoding of the same state made
+    for another message of the step instead of encoding it again. Encoded
+    parts are shared between messages and recipients and must not be
+    modified.
+    """
 
     GAME_START_MESSAGE = "game_start_message"
     ROUND_START_MESSAGE = "round_start_message"
@@ -21,7 +28,7 @@ class MessageBuilder:
         return self.__build_notification_message(message)
 
     @classmethod
-    def build_round_start_message(self, round_count, player_pos, seats):
+    def build_round_start_message(self, round_count, player_pos, seats, encoded_seats=None):
         player = seats.players[player_pos]
         hole_card = DataEncoder.encode_player(player, holecard=True)["hole_card"]
         message = {
@@ -29,43 +36,45 @@ class MessageBuilder:
             "round_count": round_count,
             "hole_card": hole_card,
         }
-        message.update(DataEncoder.encode_seats(seats))
+        message.update(DataEncoder.encode_seats(seats) if encoded_seats is None else encoded_seats)
         return self.__build_notification_message(message)
 
     @classmethod
-    def build_street_start_message(self, state):
+    def build_street_start_message(self, state, round_state=None):
         message = {
             "message_type": self.STREET_START_MESSAGE,
-            "round_state": DataEncoder.encode_round_state(state),
+            "round_state": self.__round_state(state, round_state),
         }
         message.update(DataEncoder.encode_street(state["street"]))
         return self.__build_notification_message(message)
 
     @classmethod
-    def build_ask_message(self, player_pos, state):
+    def build_ask_message(self, player_pos, state, round_state=None):
         players = state["table"].seats.players
         player = players[player_pos]
         hole_card = DataEncoder.encode_player(player, holecard=True)["hole_card"]
         valid_actions = ActionChecker.legal_actions(
-            players, player_pos, state["small_blind_amount"]
+            players, player_pos, state["small_blind_amount"], state.get("bet_state")
         )
+        round_state = self.__round_state(state, round_state)
         message = {
             "message_type": self.ASK_MESSAGE,
             "hole_card": hole_card,
             "valid_actions": valid_actions,
-            "round_state": DataEncoder.encode_round_state(state),
-            "action_histories": DataEncoder.encode_action_histories(state["table"]),
+            "round_state": round_state,
+            "action_histories": {"action_histories": round_state["action_histories"]},
         }
         return self.__build_ask_message(message)
 
     @classmethod
-    def build_game_update_message(self, player_pos, action, amount, state):
+    def build_game_update_message(self, player_pos, action, amount, state, round_state=None):
         player = state["table"].seats.players[player_pos]
+        round_state = self.__round_state(state, round_state)
         message = {
             "message_type": self.GAME_UPDATE_MESSAGE,
             "action": DataEncoder.encode_action(player, action, amount),
-            "round_state": DataEncoder.encode_round_state(state),
-            "action_histories": DataEncoder.encode_action_histories(state["table"]),
+            "round_state": round_state,
+            "action_histories": {"action_histories": round_state["action_histories"]},
         }
         return self.__build_notification_message(message)
 
@@ -88,6 +97,10 @@ class MessageBuilder:
         }
         return self.__build_notification_message(message)
 
+    @classmethod
+    def __round_state(self, state, round_state):
+        return DataEncoder.encode_round_state(state) if round_state is None else round_state
+
     @classmethod
     def __build_ask_message(self, message):
         return {"type": "ask", "message": message}
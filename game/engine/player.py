@@ -84,11 +84,10 @@ class Player:
         self.pay_info = PayInfo()
 
     def paid_sum(self):
-        pay_history = [
-            h for h in self.action_histories if h["action"] not in ["FOLD", "ANTE"]
-        ]
-        last_pay_history = pay_history[-1] if len(pay_history) != 0 else None
-        return last_pay_history["amount"] if last_pay_history else 0
+        for history in reversed(self.action_histories):
+            if history["action"] not in ["FOLD", "ANTE"]:
+                return history["amount"]
+        return 0
 
     def serialize(self):
         hole = [card.to_id() for card in self.hole_card]
@@ -7,13 +7,28 @@ from game.engine.poker_constants import PokerConstants as Const
 from game.engine.action_checker import ActionChecker
 from game.engine.game_evaluator import GameEvaluator
 from game.engine.message_builder import MessageBuilder
+from game.engine.data_encoder import DataEncoder
 
 
 class RoundManager:
+    """Plays one round as a sequence of states.
+
+    With copy_state (the default), start_new_round and apply_action leave the
+    table they are given untouched and return a state holding a deep copy.
+    Without it, the state and its table are updated in place and returned,
+    so an action costs no more than the changes it makes.
+
+    state["bet_state"] tracks the bet to match and the minimum raise of the
+    street (see ActionChecker.bet_state), so checking an action does not scan
+    the street's histories. It is set when a street starts and replaced on
+    every raise; a state without it is checked from the histories.
+    """
+
     @classmethod
-    def start_new_round(self, round_count, small_blind_amount, ante_amount, table):
-        _state = self.__gen_initial_state(round_count, small_blind_amount, table)
-        state = self.__deep_copy_state(_state)
+    def start_new_round(self, round_count, small_blind_amount, ante_amount, table, copy_state=True):
+        state = self.__gen_initial_state(round_count, small_blind_amount, table)
+        if copy_state:
+            state = self.__deep_copy_state(state)
         table = state["table"]
 
         table.deck.shuffle()
@@ -26,8 +41,8 @@ class RoundManager:
         return state, start_msg + street_msgs
 
     @classmethod
-    def apply_action(self, original_state, action, bet_amount):
-        state = self.__deep_copy_state(original_state)
+    def apply_action(self, original_state, action, bet_amount, copy_state=True):
+        state = self.__deep_copy_state(original_state) if copy_state else original_state
         state = self.__update_state_by_action(state, action, bet_amount)
         update_msg = self.__update_message(state, action, bet_amount)
         if self.__is_everyone_agreed(state):
@@ -44,9 +59,13 @@ class RoundManager:
             )
             next_player_pos = state["next_player"]
             next_player = state["table"].seats.players[next_player_pos]
+            # only next_player differs from the state the update message encoded
+            round_state = dict(
+                update_msg[1]["message"]["round_state"], next_player=next_player_pos
+            )
             ask_message = (
                 next_player.uuid,
-                MessageBuilder.build_ask_message(next_player_pos, state),
+                MessageBuilder.build_ask_message(next_player_pos, state, round_state),
             )
             return state, [update_msg, ask_message]
 
@@ -84,6 +103,9 @@ class RoundManager:
             state["table"].sb_pos() - 1
         )
         state["next_player"] = next_player_pos
+        state["bet_state"] = ActionChecker.bet_state(
+            state["table"].seats.players, state["small_blind_amount"]
+        )
         street = state["street"]
         if street == Const.Street.PREFLOP:
             return self.__preflop(state)
@@ -141,18 +163,21 @@ class RoundManager:
     @classmethod
     def __round_start_message(self, round_count, table):
         players = table.seats.players
+        encoded_seats = DataEncoder.encode_seats(table.seats)
         gen_msg = lambda idx: (
             players[idx].uuid,
-            MessageBuilder.build_round_start_message(round_count, idx, table.seats),
+            MessageBuilder.build_round_start_message(
+                round_count, idx, table.seats, encoded_seats
+            ),
         )
         return reduce(lambda acc, idx: acc + [gen_msg(idx)], range(len(players)), [])
 
     @classmethod
     def __forward_street(self, state):
         table = state["table"]
-        street_start_msg = [(-1, MessageBuilder.build_street_start_message(state))]
-        if table.seats.count_active_players() == 1:
-            street_start_msg = []
+        street_start_msg = []
+        if table.seats.count_active_players() != 1:
+            street_start_msg = [(-1, MessageBuilder.build_street_start_message(state))]
         if table.seats.count_ask_wait_players() <= 1:
             state["street"] += 1
             state, messages = self.__start_street(state)
@@ -160,10 +185,14 @@ class RoundManager:
         else:
             next_player_pos = state["next_player"]
             next_player = table.seats.players[next_player_pos]
+            # the street start message encoded this same state
+            round_state = (
+                street_start_msg[0][1]["message"]["round_state"] if street_start_msg else None
+            )
             ask_message = [
                 (
                     next_player.uuid,
-                    MessageBuilder.build_ask_message(next_player_pos, state),
+                    MessageBuilder.build_ask_message(next_player_pos, state, round_state),
                 )
             ]
             return state, street_start_msg + ask_message
@@ -171,12 +200,17 @@ class RoundManager:
     @classmethod
     def __update_state_by_action(self, state, action, bet_amount):
         table = state["table"]
+        if state.get("bet_state") is None:
+            state["bet_state"] = ActionChecker.bet_state(
+                table.seats.players, state["small_blind_amount"]
+            )
         action, bet_amount = ActionChecker.correct_action(
             table.seats.players,
             state["next_player"],
             state["small_blind_amount"],
             action,
             bet_amount,
+            state["bet_state"],
         )
         next_player = table.seats.players[state["next_player"]]
         if ActionChecker.is_allin(next_player, action, bet_amount):
@@ -191,10 +225,11 @@ class RoundManager:
             player.add_action_history(Const.Action.CALL, bet_amount)
         elif action == "raise":
             self.__chip_transaction(player, bet_amount)
-            add_amount = bet_amount - ActionChecker.agree_amount(
-                state["table"].seats.players
-            )
+            add_amount = bet_amount - state["bet_state"]["agree_amount"]
             player.add_action_history(Const.Action.RAISE, bet_amount, add_amount)
+            state["bet_state"] = ActionChecker.raised_bet_state(
+                state["bet_state"], state["next_player"], bet_amount, add_amount
+            )
         elif action == "fold":
             player.add_action_history(Const.Action.FOLD)
             player.pay_info.update_to_fold()
@@ -278,5 +313,6 @@ class RoundManager:
             "small_blind_amount": state["small_blind_amount"],
             "street": state["street"],
             "next_player": state["next_player"],
+            "bet_state": state.get("bet_state"),
             "table": table_deepcopy,
         }
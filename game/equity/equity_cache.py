@@ -0,0 +1,63 @@
+import sqlite3
+import threading
+
+
+class EquityCache:
+    """Sampled equity per canonical spot, persisted in a SQLite file.
+
+    A row holds the (sum, sum of squares, trials) of the tie-split shares
+    sampled for (spot key, opponent count), so every run adds its trials to
+    the ones before it. The whole file is read when the cache is opened, and
+    new trials are buffered and written by flush().
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS equity ("
+            "spot INTEGER, opponents INTEGER, total REAL, total_sq REAL, trials INTEGER, "
+            "PRIMARY KEY (spot, opponents))"
+        )
+        self._conn.commit()
+        self._entries = {
+            (spot, opponents): (total, total_sq, trials)
+            for spot, opponents, total, total_sq, trials in self._conn.execute(
+                "SELECT spot, opponents, total, total_sq, trials FROM equity"
+            )
+        }
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        return self._entries.get(key)
+
+    def add(self, key, moments):
+        """Add (sum, sum of squares, trials) of new trials for key."""
+        if moments[2] == 0:
+            return
+        with self._lock:
+            for entries in (self._entries, self._pending):
+                old = entries.get(key, (0.0, 0.0, 0))
+                entries[key] = tuple(a + b for a, b in zip(old, moments))
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        self._conn.executemany(
+            "INSERT INTO equity VALUES (?, ?, ?, ?, ?) ON CONFLICT (spot, opponents) DO UPDATE SET "
+            "total = total + excluded.total, total_sq = total_sq + excluded.total_sq, "
+            "trials = trials + excluded.trials",
+            [key + moments for key, moments in pending.items()],
+        )
+        self._conn.commit()
+
+    def close(self):
+        self.flush()
+        self._conn.close()
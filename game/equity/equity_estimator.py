@@ -0,0 +1,373 @@
+import math
+import threading
+import time
+from functools import wraps
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from game.engine.hand_evaluator import HandEvaluator
+from game.equity.exact_equity import ExactEquity
+from game.equity.hand_indexer import HandIndexer
+from game.equity.monte_carlo_equity import MonteCarloEquity
+from game.equity.preflop_table import PreflopTable
+
+
+# bit i set for card id i
+_CARD_BITS = np.left_shift(np.uint64(1), np.arange(53, dtype=np.uint64))
+
+
+def _synchronized(method):
+    @wraps(method)
+    def locked(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return locked
+
+
+class EquityEstimator:
+    """Equity of a hole against live opponents, shared by the agents.
+
+    Heads-up preflop spots are read from PreflopTable and small heads-up
+    spots are enumerated by ExactEquity. Everything else is sampled. Sampled
+    cards come from a buffer of live card ids, one row per trial, that is
+    kept across calls and partially shuffled in place.
+
+    When the caller passes the thresholds its decision compares the equity
+    against, sampling runs in blocks and stops once the confidence interval
+    lies entirely on one side of every threshold. With a deadline (a
+    time.monotonic() value) it keeps refining until the deadline instead of
+    stopping at num_simulations trials.
+
+    With workers > 1, sampled trials are split across a process pool that is
+    shared by every estimator with the same worker count and lives until the
+    interpreter exits. Each task gets its own child of the estimator's seed,
+    and workers return share sums that are added up exactly.
+
+    Sampling methods hold a per-estimator lock, so a player's background
+    thread and its declare_action can share one estimator.
+
+    Trials drawn by the single-process sampler are kept per hole and
+    opponent count. When the board grows, the stored trials whose runout
+    already contains the new cards are still uniform given the new board,
+    so they are reused, and only the shortfall is sampled.
+
+    sample_interval also takes one weight vector over the 1326 hole combos
+    per opponent (see RangeTracker) and then draws each opponent's hole from
+    its range. Such trials are neither stored nor sent to the process pool.
+    """
+
+    BLOCK_SIZE = 250
+    # two-sided 99% normal quantile
+    CONFIDENCE_Z = 2.576
+    # a street reuses about 1/47 of the trials stored on the one before, so
+    # 50000 trials leave a thousand or so for the next street
+    MAX_STORED_HANDS = 4
+    MAX_STORED_TRIALS = 50000
+    # rejection rounds before clashing range draws fall back to uniform holes
+    MAX_REDRAWS = 20
+
+    _pools = {}
+    _hole_bits = None
+
+    def __init__(self, num_simulations=2000, seed=None, workers=0):
+        self.num_simulations = num_simulations
+        self.workers = workers
+        self.rng = np.random.default_rng(seed)
+        self._seeds = np.random.SeedSequence(seed)
+        self._dead = None
+        self._deck = np.empty((0, 0), dtype=np.intp)
+        self._rows = np.empty(0, dtype=np.intp)
+        self._stored = {}
+        self._lock = threading.RLock()
+
+    @_synchronized
+    def estimate(
+        self, hole, community, num_opponents=1, num_simulations=None, thresholds=None, deadline=None
+    ):
+        num_simulations = self.num_simulations if num_simulations is None else num_simulations
+        if not self.uses_sampling(len(community), num_opponents, num_simulations):
+            return self.closed_form_equity(hole, community, num_opponents)
+        if deadline is not None:
+            return self.sample_interval(
+                hole, community, num_opponents, None, thresholds or (), deadline
+            )[0]
+        if thresholds:
+            return self.sample_interval(
+                hole, community, num_opponents, num_simulations, thresholds
+            )[0]
+        return self.sample_equity(hole, community, num_opponents, num_simulations)
+
+    def uses_sampling(self, num_community, num_opponents, num_simulations=None):
+        """False when estimate() reads the preflop table or enumerates instead."""
+        num_simulations = self.num_simulations if num_simulations is None else num_simulations
+        if num_opponents != 1:
+            return True
+        if num_community == 0:
+            return not PreflopTable.is_available()
+        return not ExactEquity.should_enumerate(num_community, num_simulations)
+
+    def closed_form_equity(self, hole, community, num_opponents=1):
+        if len(community) == 0:
+            return PreflopTable.equity(hole)
+        return ExactEquity.equity(hole, community)
+
+    @_synchronized
+    def sample_equity(self, hole, community, num_opponents=1, num_simulations=None):
+        num_simulations = self.num_simulations if num_simulations is None else num_simulations
+        total, _, trials = self.reused_moments(hole, community, num_opponents)
+        if trials < num_simulations:
+            total += self.sample_moments(hole, community, num_opponents, num_simulations - trials)[0]
+            trials = num_simulations
+        return float(total / trials)
+
+    @_synchronized
+    def sample_interval(
+        self, hole, community, num_opponents, num_simulations, thresholds=(), deadline=None, ranges=None
+    ):
+        """Return (equity, half_width, trials) of the best estimate so far.
+
+        Stops early once no threshold lies inside equity +- half_width, after
+        num_simulations trials, or at the deadline. num_simulations may be None
+        when a deadline is given. Trials stored from earlier calls count
+        towards the estimate, and at least BLOCK_SIZE trials are always used.
+        With ranges, num_opponents must be len(ranges) and nothing is reused.
+        """
+        moments = (0.0, 0.0, 0) if ranges is not None else self.reused_moments(hole, community, num_opponents)
+        moments = self.refine(
+            hole, community, num_opponents, moments, num_simulations, thresholds, deadline, ranges
+        )
+        return self.interval(moments) + (moments[2],)
+
+    @_synchronized
+    def refine(
+        self, hole, community, num_opponents, moments, num_simulations, thresholds=(), deadline=None,
+        ranges=None,
+    ):
+        """Add blocks of trials to moments = (sum, sum of squares, trials) and return them.
+
+        Follows the stopping rules of sample_interval, with the trials already
+        in moments counting towards num_simulations.
+        """
+        if num_simulations is None and deadline is None:
+            raise ValueError(self.__unbounded_msg)
+        total, total_sq, trials = moments
+        while not self.is_settled((total, total_sq, trials), num_simulations, thresholds, deadline):
+            block_total, block_sq, block_trials = self.sample_moments(
+                hole, community, num_opponents, self.block_size(trials, num_simulations), ranges
+            )
+            total += block_total
+            total_sq += block_sq
+            trials += block_trials
+        return total, total_sq, trials
+
+    def is_settled(self, moments, num_simulations, thresholds=(), deadline=None):
+        """True when refine would stop sampling at moments."""
+        trials = moments[2]
+        # earlier trials alone may decide, but only once there is a block's worth
+        min_trials = self.BLOCK_SIZE if num_simulations is None else min(self.BLOCK_SIZE, num_simulations)
+        if trials < min_trials:
+            return False
+        mean, half_width = self.interval(moments)
+        if thresholds and not any(mean - half_width < t < mean + half_width for t in thresholds):
+            return True
+        if deadline is not None and time.monotonic() >= deadline:
+            return True
+        return num_simulations is not None and trials >= num_simulations
+
+    def block_size(self, trials, num_simulations):
+        """Trials refine draws next when it holds trials of num_simulations."""
+        block = self.BLOCK_SIZE * max(1, self.workers)
+        if num_simulations is not None:
+            block = max(1, min(block, num_simulations - trials))
+        return block
+
+    def interval(self, moments):
+        """(mean, half_width) of the confidence interval for moments."""
+        total, total_sq, trials = moments
+        mean = total / trials
+        # one pseudo-trial of variance 1/4 keeps an all-win block from
+        # reporting a zero-width interval
+        variance = (total_sq - trials * mean * mean + 0.25) / (trials + 1)
+        return float(mean), self.CONFIDENCE_Z * math.sqrt(max(variance, 0.0) / trials)
+
+    @_synchronized
+    def sample_moments(self, hole, community, num_opponents, num_simulations, ranges=None):
+        """Return (sum, sum of squares, trials) of the sampled tie-split shares."""
+        hole_ids = [card.to_id() for card in hole]
+        board_ids = [card.to_id() for card in community]
+        if ranges is not None:
+            drawn = self.range_draw(hole_ids, board_ids, ranges, num_simulations)
+            shares = MonteCarloEquity.score_draws(hole_ids, board_ids, drawn, len(ranges))
+            return float(shares.sum()), float(np.dot(shares, shares)), len(shares)
+        if self.workers > 1 and num_simulations >= 2 * self.BLOCK_SIZE:
+            sizes = [
+                num_simulations // self.workers + (i < num_simulations % self.workers)
+                for i in range(self.workers)
+            ]
+            tasks = [
+                (hole_ids, board_ids, num_opponents, size, seed)
+                for size, seed in zip(sizes, self._seeds.spawn(self.workers))
+            ]
+            results = list(self.process_pool(self.workers).map(_sample_moments, tasks))
+            return tuple(sum(values) for values in zip(*results))
+        drawn = self.draw(hole_ids + board_ids, num_simulations, 5 - len(board_ids) + 2 * num_opponents)
+        shares = MonteCarloEquity.score_draws(hole_ids, board_ids, drawn, num_opponents)
+        self.__store_trials(hole_ids, board_ids, num_opponents, drawn, shares)
+        return float(shares.sum()), float(np.dot(shares, shares)), len(shares)
+
+    @_synchronized
+    def reused_moments(self, hole, community, num_opponents):
+        """Moments of the stored trials that are still valid for this board."""
+        hole_ids = [card.to_id() for card in hole]
+        board_ids = [card.to_id() for card in community]
+        key = (frozenset(hole_ids), num_opponents)
+        if key not in self._stored:
+            return 0.0, 0.0, 0
+        stored_board, drawn_blocks, share_blocks, _ = self._stored.pop(key)
+        new_cards = [cid for cid in board_ids if cid not in stored_board]
+        if len(stored_board) + len(new_cards) != len(board_ids):
+            return 0.0, 0.0, 0
+        drawn, shares = np.concatenate(drawn_blocks), np.concatenate(share_blocks)
+        to_come = 5 - len(stored_board)
+        runouts = drawn[:, :to_come]
+        hit = np.isin(runouts, new_cards)
+        keep = hit.sum(axis=1) == len(new_cards)
+        # drop the cards that reached the board from each kept runout
+        rest = runouts[keep][~hit[keep]].reshape(int(keep.sum()), to_come - len(new_cards))
+        drawn, shares = np.hstack([rest, drawn[keep, to_come:]]), shares[keep]
+        self._stored[key] = (frozenset(board_ids), [drawn], [shares], len(shares))
+        return float(shares.sum()), float(np.dot(shares, shares)), len(shares)
+
+    def trial_shares(self, hole, community, num_opponents, num_simulations):
+        hole_ids = [card.to_id() for card in hole]
+        board_ids = [card.to_id() for card in community]
+        return self.id_shares(hole_ids, board_ids, num_opponents, num_simulations)
+
+    def id_shares(self, hole_ids, board_ids, num_opponents, num_simulations):
+        drawn = self.draw(hole_ids + board_ids, num_simulations, 5 - len(board_ids) + 2 * num_opponents)
+        return MonteCarloEquity.score_draws(hole_ids, board_ids, drawn, num_opponents)
+
+    def range_draw(self, hole_ids, board_ids, ranges, num_trials):
+        """Rows laid out like draw(), with opponent i's hole drawn with the
+        weights ranges[i] over the 1326 hole combos."""
+        dead = hole_ids + board_ids
+        hole_bits = self.hole_bits()
+        blocked = (hole_bits & np.uint64(sum(1 << cid for cid in dead))) != 0
+        # one bit per card already dealt to an opponent in each trial
+        dealt_bits = np.zeros(num_trials, dtype=np.uint64)
+        picks = []
+        for weights in ranges:
+            weights = np.where(blocked, 0.0, weights)
+            if weights.sum() <= 0:
+                weights = np.where(blocked, 0.0, 1.0)
+            cdf = np.cumsum(weights)
+            cdf /= cdf[-1]
+            # sorted keys search several times faster; the shuffle restores independence
+            pick = np.searchsorted(cdf, np.sort(self.rng.random(num_trials)), side="right")
+            self.rng.shuffle(pick)
+            # a hole that shares a card with an earlier opponent's is drawn
+            # again, which leaves it weighted by the range among the holes left
+            rows = np.arange(num_trials)
+            for _ in range(self.MAX_REDRAWS):
+                rows = rows[(hole_bits[pick[rows]] & dealt_bits[rows]) != 0]
+                if len(rows) == 0:
+                    break
+                pick[rows] = np.searchsorted(cdf, self.rng.random(len(rows)), side="right")
+            else:
+                rows = rows[(hole_bits[pick[rows]] & dealt_bits[rows]) != 0]
+                if len(rows):
+                    rows_dead = np.hstack([
+                        np.broadcast_to(dead, (len(rows), len(dead))),
+                        HandIndexer.hole_ids()[np.stack(picks, axis=1)[rows]].reshape(len(rows), -1),
+                    ])
+                    pick[rows] = HandIndexer.hole_indices(
+                        MonteCarloEquity.draw_cards(self.rng, rows_dead, len(rows), 2)
+                    )
+            dealt_bits |= hole_bits[pick]
+            picks.append(pick)
+        dealt = HandIndexer.hole_ids()[np.stack(picks, axis=1)].reshape(num_trials, 2 * len(ranges))
+        # the runout is the first cards of a uniform shuffle that miss the
+        # opponents' holes; at most 2 per opponent are skipped
+        to_come = 5 - len(board_ids)
+        candidates = self.draw(dead, num_trials, to_come + 2 * len(ranges))
+        missed = (_CARD_BITS[candidates] & dealt_bits[:, None]) == 0
+        missed &= np.cumsum(missed, axis=1) <= to_come
+        return np.hstack([candidates[missed].reshape(num_trials, to_come), dealt])
+
+    @classmethod
+    def hole_bits(self):
+        """Card bit set of each of the 1326 hole combos."""
+        if EquityEstimator._hole_bits is None:
+            holes = HandIndexer.hole_ids()
+            EquityEstimator._hole_bits = _CARD_BITS[holes[:, 0]] | _CARD_BITS[holes[:, 1]]
+        return EquityEstimator._hole_bits
+
+    def __store_trials(self, hole_ids, board_ids, num_opponents, drawn, shares):
+        key = (frozenset(hole_ids), num_opponents)
+        board = frozenset(board_ids)
+        stored = self._stored.pop(key, None)
+        if stored is None or stored[0] != board:
+            stored = (board, [], [], 0)
+        # blocks are joined only when reused_moments reads them; card ids fit in int8
+        _, drawn_blocks, share_blocks, num_stored = stored
+        drawn_blocks.append(np.array(drawn, dtype=np.int8))
+        share_blocks.append(shares)
+        num_stored += len(shares)
+        while num_stored - len(share_blocks[0]) >= self.MAX_STORED_TRIALS:
+            num_stored -= len(share_blocks.pop(0))
+            drawn_blocks.pop(0)
+        self._stored[key] = (board, drawn_blocks, share_blocks, num_stored)
+        while len(self._stored) > self.MAX_STORED_HANDS:
+            del self._stored[next(iter(self._stored))]
+
+    @classmethod
+    def process_pool(self, workers):
+        if workers not in EquityEstimator._pools:
+            EquityEstimator._pools[workers] = ProcessPoolExecutor(
+                max_workers=workers, initializer=_warm_worker
+            )
+        return EquityEstimator._pools[workers]
+
+    def draw(self, dead_ids, num_trials, num_cards):
+        """Return a (num_trials, num_cards) view of distinct live ids per trial.
+
+        The view is overwritten by the next draw.
+        """
+        dead = frozenset(dead_ids)
+        if dead != self._dead or len(self._deck) < num_trials:
+            live = np.array([cid for cid in range(1, 53) if cid not in dead], dtype=np.intp)
+            self._deck = np.tile(live, (max(num_trials, len(self._deck)), 1))
+            self._rows = np.arange(len(self._deck))
+            self._dead = dead
+        # every row stays a permutation of the live ids, so a partial
+        # Fisher-Yates pass over the first num_cards columns is enough
+        deck, rows = self._deck[:num_trials], self._rows[:num_trials]
+        num_live = deck.shape[1]
+        for i in range(num_cards):
+            j = self.rng.integers(i, num_live, size=num_trials)
+            picked = deck[rows, j]
+            deck[rows, j] = deck[:, i]
+            deck[:, i] = picked
+        return deck[:, :num_cards]
+
+    __unbounded_msg = "Sampling needs num_simulations or a deadline"
+
+
+_worker_estimator = None
+
+
+def _warm_worker():
+    global _worker_estimator
+    _worker_estimator = EquityEstimator()
+    # build the evaluator's lookup tables before the first task arrives
+    HandEvaluator.eval_hands_batch(np.array([[1, 2, 3, 4, 5, 6, 7]]))
+
+
+def _sample_moments(task):
+    hole_ids, board_ids, num_opponents, num_trials, seed = task
+    # start from a fresh deck so the result depends on the seed alone
+    _worker_estimator.rng = np.random.default_rng(seed)
+    _worker_estimator._dead = None
+    shares = _worker_estimator.id_shares(hole_ids, board_ids, num_opponents, num_trials)
+    return float(shares.sum()), float(np.dot(shares, shares)), len(shares)
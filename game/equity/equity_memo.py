@@ -0,0 +1,137 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from game.equity.hand_indexer import HandIndexer
+
+
+class EquityMemo:
+    """Equity results of one agent, keyed by canonical (hole, board, opponents).
+
+    A spot asked again returns at once when the remembered result already
+    answers the request. Otherwise the remembered trials are topped up, so
+    samples accumulate across asks. Entries are dropped when a street starts
+    and the least recently used ones go beyond max_entries.
+
+    Trials are drawn in blocks outside the memo's lock, and every block is
+    merged into the spot's entry as soon as it is drawn, so estimates running
+    at the same time share their trials. A background estimate stops after
+    its current block once the street changes or a foreground estimate
+    starts, which then goes on from the trials merged so far.
+
+    With an EquityCache, a spot seen in an earlier run starts from the cached
+    trials, and the trials sampled here are added to the cache.
+
+    Estimates with opponent ranges (see EquityEstimator.sample_interval) are
+    kept under the exact spot and the ranges' contents. They always sample,
+    start from no trials and are not cached.
+    """
+
+    MAX_ENTRIES = 64
+
+    def __init__(self, estimator, max_entries=None, cache=None):
+        self.estimator = estimator
+        self.cache = cache
+        self.max_entries = self.MAX_ENTRIES if max_entries is None else max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._streets = 0
+        self._foreground_starts = 0
+        self._foreground_running = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def start_street(self):
+        with self._lock:
+            self._entries.clear()
+            self._streets += 1
+
+    def estimate(
+        self, hole, community, num_opponents=1, num_simulations=None, thresholds=None, deadline=None,
+        background=False, ranges=None,
+    ):
+        if ranges is not None:
+            key = (HandIndexer.spot_key(hole, community), len(ranges), self.__ranges_key(ranges))
+        else:
+            key = (HandIndexer.canonical_spot_key(hole, community), num_opponents)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None and ranges is None and not self.estimator.uses_sampling(
+                len(community), num_opponents, num_simulations
+            ):
+                entry = self.estimator.closed_form_equity(hole, community, num_opponents)
+            # cached and stored trials are read under the lock, so they are counted once
+            added = (0.0, 0.0, 0)
+            if entry is None and ranges is not None:
+                entry = (0.0, 0.0, 0)
+            elif entry is None:
+                entry, added = self.__load(key, hole, community, num_opponents)
+            self.__put(key, entry)
+            if isinstance(entry, float):
+                return entry
+            started = (self._streets, self._foreground_starts)
+            if not background:
+                self._foreground_starts += 1
+                self._foreground_running += 1
+        try:
+            moments, sampled = self.__sample(
+                key, hole, community, num_opponents, entry, num_simulations, thresholds, deadline,
+                started, background, ranges,
+            )
+        finally:
+            if not background:
+                with self._lock:
+                    self._foreground_running -= 1
+        if self.cache is not None and ranges is None:
+            self.cache.add(key, tuple(a + b for a, b in zip(added, sampled)))
+        return self.estimator.interval(moments)[0]
+
+    def __load(self, key, hole, community, num_opponents):
+        # cached trials include any this process recorded for the spot, so
+        # they replace the estimator's stored trials instead of adding to them
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached:
+            return cached, (0.0, 0.0, 0)
+        moments = self.estimator.reused_moments(hole, community, num_opponents)
+        return moments, moments
+
+    def __sample(
+        self, key, hole, community, num_opponents, moments, num_simulations, thresholds, deadline,
+        started, background, ranges,
+    ):
+        """Draw blocks until moments settle and return (moments, the part sampled here)."""
+        if deadline is not None:
+            num_simulations = None
+        elif num_simulations is None:
+            num_simulations = self.estimator.num_simulations
+        sampled = (0.0, 0.0, 0)
+        while not self.estimator.is_settled(moments, num_simulations, thresholds or (), deadline):
+            if background and self.__is_superseded(started):
+                break
+            block = self.estimator.sample_moments(
+                hole, community, num_opponents, self.estimator.block_size(moments[2], num_simulations), ranges
+            )
+            sampled = tuple(a + b for a, b in zip(sampled, block))
+            with self._lock:
+                if self._streets != started[0]:
+                    moments = tuple(a + b for a, b in zip(moments, block))
+                    continue
+                # blocks merged meanwhile by another estimate of the spot count too
+                merged = self._entries.pop(key, moments)
+                moments = tuple(a + b for a, b in zip(merged, block))
+                self.__put(key, moments)
+        return moments, sampled
+
+    def __ranges_key(self, ranges):
+        return hash(tuple(np.asarray(weights, dtype=np.float64).tobytes() for weights in ranges))
+
+    def __is_superseded(self, started):
+        with self._lock:
+            return self._foreground_running > 0 or started != (self._streets, self._foreground_starts)
+
+    def __put(self, key, entry):
+        self._entries[key] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
@@ -0,0 +1,92 @@
+from functools import lru_cache
+from itertools import combinations
+from math import comb
+
+import numpy as np
+
+from game.engine.hand_evaluator import HandEvaluator
+
+
+class ExactEquity:
+    """Heads-up equity by enumerating every runout and opponent hole."""
+
+    # One sampled trial costs about as much as enumerating 2 outcomes
+    # (~0.2us vs ~0.1us on the river, ~0.065us on the turn).
+    SIMULATION_COST = 2
+    MAX_BATCH_ROWS = 100000
+
+    @classmethod
+    def num_outcomes(self, num_community):
+        unseen = 52 - 2 - num_community
+        to_come = 5 - num_community
+        return comb(unseen, to_come) * comb(unseen - to_come, 2)
+
+    @classmethod
+    def should_enumerate(
+        self, num_community, num_simulations, exhaustive_flop=False, simulation_cost=None
+    ):
+        if num_community < 3:
+            return False
+        if num_community == 3 and exhaustive_flop:
+            return True
+        if simulation_cost is None:
+            simulation_cost = self.SIMULATION_COST
+        return self.num_outcomes(num_community) <= num_simulations * simulation_cost
+
+    @classmethod
+    def win_rate(self, hole, community):
+        win, _, total = self.enumerate(hole, community)
+        return win / total
+
+    @classmethod
+    def equity(self, hole, community):
+        win, tie, total = self.enumerate(hole, community)
+        return (win + tie / 2) / total
+
+    @classmethod
+    def enumerate(self, hole, community):
+        """Return (win, tie, total) counts over all outcomes."""
+        if len(community) < 3:
+            raise ValueError(self.__preflop_msg)
+        hole_ids = [card.to_id() for card in hole]
+        board_ids = [card.to_id() for card in community]
+        known = set(hole_ids + board_ids)
+        unseen = np.array([cid for cid in range(1, 53) if cid not in known])
+        runouts = _combinations(len(unseen), 5 - len(community))
+        pairs = _combinations(len(unseen) - runouts.shape[1], 2)
+
+        win = tie = total = 0
+        chunk = max(1, self.MAX_BATCH_ROWS // len(pairs))
+        for start in range(0, len(runouts), chunk):
+            runout_pos = runouts[start : start + chunk]
+            num_runouts = len(runout_pos)
+            boards = np.hstack(
+                [np.repeat([board_ids], num_runouts, axis=0), unseen[runout_pos]]
+            )
+            my_scores = HandEvaluator.eval_hands_batch(
+                np.hstack([np.repeat([hole_ids], num_runouts, axis=0), boards])
+            )
+
+            # cards left for the opponent once each runout is dealt
+            rest_mask = np.ones((num_runouts, len(unseen)), dtype=bool)
+            rest_mask[np.arange(num_runouts)[:, None], runout_pos] = False
+            rest = np.broadcast_to(unseen, rest_mask.shape)[rest_mask]
+            opp_holes = rest.reshape(num_runouts, -1)[:, pairs]
+            opp_rows = np.concatenate(
+                [opp_holes, np.broadcast_to(boards[:, None, :], (num_runouts, len(pairs), 5))],
+                axis=2,
+            )
+            opp_scores = HandEvaluator.eval_hands_batch(opp_rows.reshape(-1, 7))
+            opp_scores = opp_scores.reshape(num_runouts, len(pairs))
+
+            win += int((my_scores[:, None] > opp_scores).sum())
+            tie += int((my_scores[:, None] == opp_scores).sum())
+            total += opp_scores.size
+        return win, tie, total
+
+    __preflop_msg = "Exact enumeration needs at least three community cards"
+
+
+@lru_cache(maxsize=None)
+def _combinations(n, k):
+    return np.array(list(combinations(range(n), k)), dtype=np.intp).reshape(comb(n, k), k)
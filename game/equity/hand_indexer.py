@@ -0,0 +1,117 @@
+from math import comb
+
+import numpy as np
+
+from game.engine.card import Card
+
+
+class HandIndexer:
+    """Dense integer indices for hole/board card sets.
+
+    Cards are numbered 0..51 (Card.to_id() - 1) and a k-card set is ranked in
+    colexicographic order, so holes map onto 0..1325 and flops onto 0..22099.
+    Suit-isomorphic spots are reduced to one representative by relabelling the
+    suits in a canonical order before indexing.
+    """
+
+    NUM_HOLES = comb(52, 2)
+    NUM_FLOPS = comb(52, 3)
+    NUM_CANONICAL_HOLES = 169
+    SUITS = [Card.CLUB, Card.DIAMOND, Card.HEART, Card.SPADE]
+    # start of each board size's block inside a spot key
+    BOARD_OFFSETS = [sum(comb(52, j) for j in range(k)) for k in range(6)]
+
+    _hole_ids = None
+    _canonical_flops = None
+
+    @classmethod
+    def combination_index(self, cards):
+        indices = sorted(card.to_id() - 1 for card in cards)
+        return sum(comb(c, i + 1) for i, c in enumerate(indices))
+
+    @classmethod
+    def combination_from_index(self, index, num_cards):
+        indices = []
+        for k in range(num_cards, 0, -1):
+            c = k - 1
+            while comb(c + 1, k) <= index:
+                c += 1
+            indices.append(c)
+            index -= comb(c, k)
+        return [Card.from_id(c + 1) for c in reversed(indices)]
+
+    @classmethod
+    def hole_index(self, hole):
+        return self.combination_index(hole)
+
+    @classmethod
+    def hole_from_index(self, index):
+        return self.combination_from_index(index, 2)
+
+    @classmethod
+    def flop_index(self, flop):
+        return self.combination_index(flop)
+
+    @classmethod
+    def flop_from_index(self, index):
+        return self.combination_from_index(index, 3)
+
+    @classmethod
+    def hole_ids(self):
+        """(1326, 2) array of Card ids, row i being hole_from_index(i)."""
+        if HandIndexer._hole_ids is None:
+            ids = [[c.to_id() for c in self.hole_from_index(i)] for i in range(self.NUM_HOLES)]
+            HandIndexer._hole_ids = np.array(ids, dtype=np.intp)
+            HandIndexer._hole_ids.flags.writeable = False
+        return HandIndexer._hole_ids
+
+    @classmethod
+    def hole_indices(self, hole_ids):
+        """Vectorised hole_index for an (N, 2) array of Card ids."""
+        low = np.minimum(hole_ids[:, 0], hole_ids[:, 1]) - 1
+        high = np.maximum(hole_ids[:, 0], hole_ids[:, 1]) - 1
+        return high * (high - 1) // 2 + low
+
+    @classmethod
+    def canonicalize(self, hole, board=[]):
+        """Relabel suits so that every isomorphic (hole, board) gives the same cards."""
+        signature = lambda suit: (
+            sorted([c.rank for c in hole if c.suit == suit], reverse=True),
+            sorted([c.rank for c in board if c.suit == suit], reverse=True),
+        )
+        ordered_suits = sorted(self.SUITS, key=signature, reverse=True)
+        suit_map = {suit: self.SUITS[i] for i, suit in enumerate(ordered_suits)}
+        relabel = lambda cards: sorted(
+            [Card(suit_map[c.suit], c.rank) for c in cards], key=lambda c: c.to_id()
+        )
+        return relabel(hole), relabel(board)
+
+    @classmethod
+    def canonical_hole_index(self, hole):
+        # 13x13 grid: pairs on the diagonal, suited above it, offsuit below it
+        card1, card2 = hole
+        high, low = max(card1.rank, card2.rank) - 2, min(card1.rank, card2.rank) - 2
+        if card1.suit == card2.suit:
+            return high * 13 + low
+        return low * 13 + high
+
+    @classmethod
+    def canonical_flop_index(self, flop):
+        """Dense index in 0..1754 of the flop's suit-isomorphism class."""
+        if HandIndexer._canonical_flops is None:
+            representatives = [
+                self.flop_index(self.canonicalize([], self.flop_from_index(i))[1])
+                for i in range(self.NUM_FLOPS)
+            ]
+            _, dense = np.unique(representatives, return_inverse=True)
+            HandIndexer._canonical_flops = dense
+        return int(HandIndexer._canonical_flops[self.flop_index(flop)])
+
+    @classmethod
+    def spot_key(self, hole, board=[]):
+        board_index = self.BOARD_OFFSETS[len(board)] + self.combination_index(board)
+        return self.hole_index(hole) + self.NUM_HOLES * board_index
+
+    @classmethod
+    def canonical_spot_key(self, hole, board=[]):
+        return self.spot_key(*self.canonicalize(hole, board))
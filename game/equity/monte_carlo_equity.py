@@ -0,0 +1,78 @@
+import numpy as np
+
+from game.engine.hand_evaluator import HandEvaluator
+
+
+class MonteCarloEquity:
+    """Sampled equity against any number of random opponent hands.
+
+    Each trial deals one runout shared by every opponent, and a pot won
+    together with k other players counts as a 1/(k+1) share.
+    """
+
+    @classmethod
+    def equity(self, hole, community, num_opponents=1, num_simulations=2000, rng=None):
+        return float(
+            self.trial_shares(hole, community, num_opponents, num_simulations, rng).mean()
+        )
+
+    @classmethod
+    def win_rate(self, hole, community, num_opponents=1, num_simulations=2000, rng=None):
+        shares = self.trial_shares(hole, community, num_opponents, num_simulations, rng)
+        return float((shares == 1).mean())
+
+    @classmethod
+    def trial_shares(self, hole, community, num_opponents=1, num_simulations=2000, rng=None):
+        rng = np.random.default_rng() if rng is None else rng
+        hole_ids = [card.to_id() for card in hole]
+        board_ids = [card.to_id() for card in community]
+        drawn = self.draw_cards(
+            rng, hole_ids + board_ids, num_simulations, 5 - len(board_ids) + 2 * num_opponents
+        )
+        return self.score_draws(hole_ids, board_ids, drawn, num_opponents)
+
+    @classmethod
+    def score_draws(self, hole_ids, board_ids, drawn, num_opponents):
+        """Shares for drawn rows holding the rest of the board, then the opponents' holes."""
+        num_trials, to_come = len(drawn), 5 - len(board_ids)
+        boards = np.hstack(
+            [np.broadcast_to(np.array(board_ids, dtype=np.intp), (num_trials, len(board_ids))),
+             drawn[:, :to_come]]
+        )
+        my_scores = HandEvaluator.eval_hands_batch(
+            np.hstack([np.broadcast_to(hole_ids, (num_trials, 2)), boards])
+        )
+        opp_holes = drawn[:, to_come:].reshape(num_trials, num_opponents, 2)
+        opp_rows = np.concatenate(
+            [opp_holes, np.broadcast_to(boards[:, None, :], (num_trials, num_opponents, 5))],
+            axis=2,
+        )
+        opp_scores = HandEvaluator.eval_hands_batch(opp_rows.reshape(-1, 7))
+        return self.split_shares(my_scores, opp_scores.reshape(num_trials, num_opponents))
+
+    @classmethod
+    def split_shares(self, my_scores, opp_scores):
+        best_opp = opp_scores.max(axis=1)
+        num_tied = (opp_scores == my_scores[:, None]).sum(axis=1)
+        return np.where(
+            my_scores > best_opp,
+            1.0,
+            np.where(my_scores == best_opp, 1.0 / (num_tied + 1), 0.0),
+        )
+
+    @classmethod
+    def draw_cards(self, rng, dead, num_trials, num_cards):
+        """Draw num_cards distinct Card ids per trial, avoiding the dead ids.
+
+        dead is either one list of ids shared by all trials or an
+        (num_trials, d) array with per-trial dead cards.
+        """
+        # a random permutation of the ids 1..52 per row, with dead cards sorted last
+        keys = rng.random((num_trials, 53))
+        keys[:, 0] = 2.0
+        dead = np.asarray(dead, dtype=np.intp)
+        if dead.ndim == 1:
+            keys[:, dead] = 2.0
+        else:
+            keys[np.arange(num_trials)[:, None], dead] = 2.0
+        return np.argsort(keys, axis=1)[:, :num_cards]
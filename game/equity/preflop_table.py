@@ -0,0 +1,151 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from game.engine.hand_evaluator import HandEvaluator
+from game.equity.hand_indexer import HandIndexer
+from game.equity.monte_carlo_equity import MonteCarloEquity
+
+
+class PreflopTable:
+    """Preflop win/tie rates of the 169 canonical hands, read from disk.
+
+    The table has shape (169, 170, 2). Entry [i, j] holds the (win, tie) rates
+    of hand i against hand j, and column RANDOM holds them against a random hand.
+    """
+
+    NUM_HANDS = 169
+    RANDOM = 169
+    RANK_ORDER = "23456789TJQKA"
+    TABLE_PATH = os.path.join(os.path.dirname(__file__), "data", "preflop_equity.npy")
+
+    _table = None
+
+    @classmethod
+    def hand_index(self, hole):
+        return HandIndexer.canonical_hole_index(hole)
+
+    @classmethod
+    def hand_key(self, index):
+        row, col = divmod(index, 13)
+        if row == col:
+            return self.RANK_ORDER[row] * 2
+        if row > col:
+            return self.RANK_ORDER[row] + self.RANK_ORDER[col] + "s"
+        return self.RANK_ORDER[col] + self.RANK_ORDER[row] + "o"
+
+    @classmethod
+    def index_from_key(self, key):
+        high, low = self.RANK_ORDER.index(key[0]), self.RANK_ORDER.index(key[1])
+        if len(key) == 2 or key[2] == "o":
+            return min(high, low) * 13 + max(high, low)
+        return high * 13 + low
+
+    @classmethod
+    def hand_combos(self, index):
+        holes = [HandIndexer.hole_from_index(i) for i in range(HandIndexer.NUM_HOLES)]
+        return [tuple(hole) for hole in holes if self.hand_index(hole) == index]
+
+    @classmethod
+    def load(self, path=None):
+        if path is not None or PreflopTable._table is None:
+            path = self.TABLE_PATH if path is None else path
+            PreflopTable._table = np.load(path, mmap_mode="r") if os.path.exists(path) else False
+        return PreflopTable._table
+
+    @classmethod
+    def is_available(self):
+        return self.load() is not False
+
+    @classmethod
+    def rates(self, hole, opponent=None):
+        column = self.RANDOM if opponent is None else self.hand_index(opponent)
+        win, tie = self.load()[self.hand_index(hole), column]
+        return float(win), float(tie)
+
+    @classmethod
+    def win_rate(self, hole, opponent=None):
+        return self.rates(hole, opponent)[0]
+
+    @classmethod
+    def equity(self, hole, opponent=None):
+        win, tie = self.rates(hole, opponent)
+        return win + tie / 2
+
+    @classmethod
+    def generate(self, path=None, random_samples=200000, matrix_samples=20000, workers=None, seed=0):
+        path = self.TABLE_PATH if path is None else path
+        combos = [
+            np.array([[c1.to_id(), c2.to_id()] for c1, c2 in self.hand_combos(index)])
+            for index in range(self.NUM_HANDS)
+        ]
+        pairs = [(i, j) for i in range(self.NUM_HANDS) for j in range(i, self.NUM_HANDS)]
+        seeds = np.random.SeedSequence(seed).spawn(self.NUM_HANDS + len(pairs))
+
+        table = np.zeros((self.NUM_HANDS, self.NUM_HANDS + 1, 2), dtype=np.float32)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            random_tasks = [(combos[i][0], random_samples, seeds[i]) for i in range(self.NUM_HANDS)]
+            for i, rates in enumerate(pool.map(_simulate_vs_random, random_tasks)):
+                table[i, self.RANDOM] = rates
+            matrix_tasks = [
+                (combos[i], combos[j], matrix_samples, seeds[self.NUM_HANDS + k])
+                for k, (i, j) in enumerate(pairs)
+            ]
+            results = pool.map(_simulate_matchup, matrix_tasks, chunksize=64)
+            for (i, j), (win, tie) in zip(pairs, results):
+                if i == j:
+                    win = (1 - tie) / 2
+                table[i, j] = win, tie
+                table[j, i] = 1 - win - tie, tie
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.save(path, table)
+        PreflopTable._table = None
+        return table
+
+
+def _simulate_vs_random(task, batch_size=20000):
+    hole, num_samples, seed = task
+    rng = np.random.default_rng(seed)
+    win = tie = 0
+    for start in range(0, num_samples, batch_size):
+        size = min(batch_size, num_samples - start)
+        holes = np.repeat([hole], size, axis=0)
+        drawn = MonteCarloEquity.draw_cards(rng, holes, size, 7)
+        boards = drawn[:, 2:]
+        my_scores = HandEvaluator.eval_hands_batch(np.hstack([holes, boards]))
+        opp_scores = HandEvaluator.eval_hands_batch(drawn)
+        win += int((my_scores > opp_scores).sum())
+        tie += int((my_scores == opp_scores).sum())
+    return win / num_samples, tie / num_samples
+
+
+def _simulate_matchup(task):
+    combos, opp_combos, num_samples, seed = task
+    rng = np.random.default_rng(seed)
+    # every non-overlapping pairing of the two hands' combos is equally likely
+    overlap = (combos[:, None, :, None] == opp_combos[None, :, None, :]).any(axis=(2, 3))
+    hole_idx, opp_idx = np.nonzero(~overlap)
+    pick = rng.integers(len(hole_idx), size=num_samples)
+    holes, opp_holes = combos[hole_idx[pick]], opp_combos[opp_idx[pick]]
+    boards = MonteCarloEquity.draw_cards(rng, np.hstack([holes, opp_holes]), num_samples, 5)
+    my_scores = HandEvaluator.eval_hands_batch(np.hstack([holes, boards]))
+    opp_scores = HandEvaluator.eval_hands_batch(np.hstack([opp_holes, boards]))
+    return (my_scores > opp_scores).mean(), (my_scores == opp_scores).mean()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", default=PreflopTable.TABLE_PATH)
+    parser.add_argument("--random-samples", type=int, default=200000)
+    parser.add_argument("--matrix-samples", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    PreflopTable.generate(
+        args.output, args.random_samples, args.matrix_samples, args.workers, args.seed
+    )
+    print(f"Saved preflop equity table to {args.output}")
@@ -0,0 +1,177 @@
+from math import comb
+
+import numpy as np
+
+from game.engine.hand_evaluator import HandEvaluator
+from game.equity.exact_equity import _combinations
+from game.equity.hand_indexer import HandIndexer
+from game.equity.monte_carlo_equity import MonteCarloEquity
+from game.equity.preflop_table import PreflopTable
+
+
+class RangeEquity:
+    """Equity between weighted ranges over the 1326 hole combinations.
+
+    A range is a length-1326 weight vector whose entry i belongs to the hole
+    HandIndexer.hole_from_index(i). Turn and river runouts are enumerated,
+    earlier streets are sampled with max_runouts random runouts.
+    """
+
+    MAX_RUNOUTS = 1000
+    MAX_BATCH_ROWS = 100000
+    MAX_PAIR_CELLS = 1 << 23
+
+    _combo_classes = None
+
+    @classmethod
+    def empty_range(self):
+        return np.zeros(HandIndexer.NUM_HOLES)
+
+    @classmethod
+    def full_range(self, dead=[]):
+        return self.remove_dead(np.ones(HandIndexer.NUM_HOLES), dead)
+
+    @classmethod
+    def hole_range(self, hole):
+        weights = self.empty_range()
+        weights[HandIndexer.hole_index(hole)] = 1.0
+        return weights
+
+    @classmethod
+    def range_from_keys(self, keys, weight=1.0, dead=[]):
+        """Range holding every combo of the given hand classes, e.g. {"AKs", "QQ"}."""
+        classes = [PreflopTable.index_from_key(key) for key in keys]
+        weights = np.where(np.isin(self.combo_classes(), classes), weight, 0.0)
+        return self.remove_dead(weights, dead)
+
+    @classmethod
+    def combo_classes(self):
+        """Canonical preflop class (0..168) of each of the 1326 combos."""
+        if RangeEquity._combo_classes is None:
+            RangeEquity._combo_classes = np.array([
+                HandIndexer.canonical_hole_index(HandIndexer.hole_from_index(i))
+                for i in range(HandIndexer.NUM_HOLES)
+            ])
+        return RangeEquity._combo_classes
+
+    @classmethod
+    def remove_dead(self, weights, dead):
+        dead_ids = [card.to_id() for card in dead]
+        blocked = np.isin(HandIndexer.hole_ids(), dead_ids).any(axis=1)
+        return np.where(blocked, 0.0, weights)
+
+    @classmethod
+    def equity_matrix(self, range_a, range_b, community, dead=[], max_runouts=None, rng=None):
+        """Return (matrix, rows, cols) for every weighted combo pair.
+
+        rows and cols are the hole indices of the combos with positive weight
+        in range_a and range_b after card removal. matrix[i, j] is the equity
+        of combo rows[i] against combo cols[j], or nan when they share a card.
+        """
+        range_a = self.remove_dead(range_a, list(community) + list(dead))
+        range_b = self.remove_dead(range_b, list(community) + list(dead))
+        rows, cols = np.nonzero(range_a > 0)[0], np.nonzero(range_b > 0)[0]
+        union, inverse = np.unique(np.concatenate([rows, cols]), return_inverse=True)
+        a_pos, b_pos = inverse[: len(rows)], inverse[len(rows) :]
+        hole_ids = HandIndexer.hole_ids()[union]
+
+        board_ids = [card.to_id() for card in community]
+        runouts = self.__runouts(board_ids + [card.to_id() for card in dead], len(board_ids),
+                                 max_runouts, rng)
+        # sign(a - b) summed over the runouts, so 2 points for a win and 1 for
+        # a tie come out as the sum plus the number of runouts
+        points = np.zeros((len(rows), len(cols)), dtype=self.__points_dtype(len(runouts)))
+        counts = np.zeros((len(rows), len(cols)))
+        chunk = max(1, self.MAX_BATCH_ROWS // max(1, len(union)))
+        step = max(1, self.MAX_PAIR_CELLS // max(1, len(rows) * len(cols)))
+        signs = np.empty((min(step, len(runouts)), len(rows), len(cols)), dtype=np.int16)
+        for start in range(0, len(runouts), chunk):
+            scores, valid = self.__score_holes(hole_ids, board_ids, runouts[start : start + chunk])
+            ranks_a, ranks_b = self.__pair_ranks(scores, valid, a_pos, b_pos)
+            for first in range(0, len(ranks_a), step):
+                run_a, run_b = ranks_a[first : first + step], ranks_b[first : first + step]
+                run_signs = signs[: len(run_a)]
+                np.subtract(run_a[:, :, None], run_b[:, None, :], out=run_signs)
+                np.sign(run_signs, out=run_signs)
+                points += run_signs.sum(axis=0, dtype=points.dtype)
+            # number of runouts that leave both combos of a pair live
+            counts += valid[:, a_pos].T.astype(float) @ valid[:, b_pos].astype(float)
+        points += len(runouts)
+
+        ids_a, ids_b = HandIndexer.hole_ids()[rows], HandIndexer.hole_ids()[cols]
+        overlap = (ids_a[:, None, :, None] == ids_b[None, :, None, :]).any(axis=(2, 3))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            matrix = points / (2.0 * counts)
+        matrix[overlap | (counts == 0)] = np.nan
+        return matrix, rows, cols
+
+    @classmethod
+    def hand_equities(self, range_a, range_b, community, dead=[], max_runouts=None, rng=None):
+        """Equity of each combo of range_a against range_b, nan outside range_a."""
+        matrix, rows, cols = self.equity_matrix(range_a, range_b, community, dead, max_runouts, rng)
+        weights = np.where(np.isnan(matrix), 0.0, range_b[cols][None, :])
+        with np.errstate(invalid="ignore"):
+            row_equity = np.nansum(matrix * weights, axis=1) / weights.sum(axis=1)
+        equities = np.full(HandIndexer.NUM_HOLES, np.nan)
+        equities[rows] = row_equity
+        return equities
+
+    @classmethod
+    def equity(self, range_a, range_b, community, dead=[], max_runouts=None, rng=None):
+        """Overall equity of range_a against range_b, weighting each combo pair."""
+        matrix, rows, cols = self.equity_matrix(range_a, range_b, community, dead, max_runouts, rng)
+        weights = range_a[rows][:, None] * range_b[cols][None, :]
+        weights = np.where(np.isnan(matrix), 0.0, weights)
+        return float(np.nansum(matrix * weights) / weights.sum())
+
+    @classmethod
+    def hand_vs_range(self, hole, range_b, community, max_runouts=None, rng=None):
+        return self.equity(self.hole_range(hole), range_b, community, [], max_runouts, rng)
+
+    @classmethod
+    def __runouts(self, known_ids, num_community, max_runouts, rng):
+        max_runouts = self.MAX_RUNOUTS if max_runouts is None else max_runouts
+        to_come = 5 - num_community
+        unseen = np.array([cid for cid in range(1, 53) if cid not in known_ids])
+        if comb(len(unseen), to_come) <= max_runouts:
+            return unseen[_combinations(len(unseen), to_come)]
+        rng = np.random.default_rng() if rng is None else rng
+        return MonteCarloEquity.draw_cards(rng, known_ids, max_runouts, to_come)
+
+    @classmethod
+    def __points_dtype(self, num_runouts):
+        return np.int16 if 2 * num_runouts <= np.iinfo(np.int16).max else np.int32
+
+    @classmethod
+    def __pair_ranks(self, scores, valid, a_pos, b_pos):
+        """Dense int16 ranks of the row and column combos' scores on each runout.
+
+        A row combo the runout blocks ranks below every column and a blocked
+        column combo above every row, so the pairs they are in lose on it.
+        """
+        distinct, ranks = np.unique(scores, return_inverse=True)
+        ranks = ranks.reshape(scores.shape).astype(np.int16) + 1
+        blocked_rank = len(distinct) + 2
+        ranks_a = np.where(valid[:, a_pos], ranks[:, a_pos], -blocked_rank).astype(np.int16)
+        ranks_b = np.where(valid[:, b_pos], ranks[:, b_pos], blocked_rank).astype(np.int16)
+        return ranks_a, ranks_b
+
+    @classmethod
+    def __score_holes(self, hole_ids, board_ids, runouts):
+        """Scores of every hole on every runout, plus which holes the runout leaves live."""
+        num_runouts, num_holes = len(runouts), len(hole_ids)
+        hole_bits = np.bitwise_or.reduce(self.__card_bits(hole_ids), axis=1)
+        runout_bits = np.bitwise_or.reduce(self.__card_bits(runouts), axis=1)
+        valid = (hole_bits[None, :] & runout_bits[:, None]) == 0
+        run_pos, hole_pos = np.nonzero(valid)
+        rows = np.empty((len(run_pos), 7), dtype=np.intp)
+        rows[:, :2] = hole_ids[hole_pos]
+        rows[:, 2 : 2 + len(board_ids)] = board_ids
+        rows[:, 2 + len(board_ids) :] = runouts[run_pos]
+        scores = np.zeros((num_runouts, num_holes), dtype=np.int32)
+        scores[valid] = HandEvaluator.eval_hands_batch(rows)
+        return scores, valid
+
+    @classmethod
+    def __card_bits(self, card_ids):
+        return np.left_shift(np.uint64(1), np.asarray(card_ids, dtype=np.uint64))
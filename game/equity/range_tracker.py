@@ -0,0 +1,97 @@
+import numpy as np
+
+from game.engine.hand_evaluator import HandEvaluator
+from game.equity.hand_indexer import HandIndexer
+from game.equity.preflop_table import PreflopTable
+from game.equity.range_equity import RangeEquity
+
+
+class RangeTracker:
+    """One opponent's range over the 1326 hole combos, narrowed as a round is played.
+
+    Known cards zero the combos that hold them. Each action the opponent
+    takes multiplies the weights by how likely that action is for every
+    combo, as a function of the combo's strength: its percentile among the
+    live combos by preflop equity before the flop, and by made-hand rank on
+    the board after it. Raises lean towards strong combos and more so the
+    larger they are, calls less so, and checks slightly away from them.
+
+    narrowed turns True at the opponent's first raise. Calls and checks
+    reweight the range as well, but alone they leave it close enough to a
+    random hand that the uniform estimates are used instead.
+    """
+
+    # share of a raise range that is bluffs, whatever the raise size
+    RAISE_FLOOR = 0.1
+    CALL_FLOOR = 0.3
+    CHECK_DISCOUNT = 0.5
+    # raises above this many pots count as this many
+    MAX_RAISE_POTS = 2.0
+
+    _preflop_strengths = None
+
+    def __init__(self, dead=[]):
+        self.weights = np.ones(HandIndexer.NUM_HOLES)
+        self.narrowed = False
+        self._board = None
+        self._strengths = None
+        self.remove_cards(dead)
+
+    def remove_cards(self, cards):
+        self.weights = RangeEquity.remove_dead(self.weights, cards)
+
+    def observe(self, action, paid, pot, community):
+        """Update on an action that put paid chips into a pot of pot chips."""
+        action = action.lower()
+        if action not in ["call", "raise"]:
+            return
+        self.remove_cards(community)
+        strengths = self.strengths(community)
+        if action == "raise":
+            exponent = 1.0 + min(self.MAX_RAISE_POTS, paid / max(1, pot))
+            likelihood = self.RAISE_FLOOR + (1 - self.RAISE_FLOOR) * strengths ** exponent
+        elif paid > 0:
+            likelihood = self.CALL_FLOOR + (1 - self.CALL_FLOOR) * strengths
+        else:
+            likelihood = 1 - self.CHECK_DISCOUNT * strengths ** 2
+        self.weights *= likelihood
+        self.narrowed = self.narrowed or action == "raise"
+
+    def strengths(self, community):
+        """Percentile (0..1) of every combo among the live combos on this board."""
+        board_ids = tuple(card.to_id() for card in community)
+        if board_ids == self._board:
+            return self._strengths
+        live = np.nonzero(self.weights > 0)[0]
+        if len(board_ids) == 0:
+            values = self.preflop_strengths()[live]
+        else:
+            hole_ids = HandIndexer.hole_ids()[live]
+            board = np.broadcast_to(np.array(board_ids, dtype=np.intp), (len(live), len(board_ids)))
+            values = HandEvaluator.eval_hands_batch(np.hstack([hole_ids, board]))
+        ordered = np.sort(values)
+        # ties share the middle of their percentile span
+        below = np.searchsorted(ordered, values, side="left")
+        not_above = np.searchsorted(ordered, values, side="right")
+        self._strengths = np.zeros(HandIndexer.NUM_HOLES)
+        self._strengths[live] = (below + not_above) / (2.0 * max(1, len(live)))
+        self._board = board_ids
+        return self._strengths
+
+    def range(self):
+        """Weights normalised to sum to 1, or uniform if no weight is left."""
+        total = self.weights.sum()
+        if total == 0:
+            return np.full(HandIndexer.NUM_HOLES, 1.0 / HandIndexer.NUM_HOLES)
+        return self.weights / total
+
+    @classmethod
+    def preflop_strengths(self):
+        """Equity against a random hand of each combo's class, 0.5 without the table."""
+        if RangeTracker._preflop_strengths is None:
+            if PreflopTable.is_available():
+                table = np.asarray(PreflopTable.load()[:, PreflopTable.RANDOM])
+                RangeTracker._preflop_strengths = (table[:, 0] + table[:, 1] / 2)[RangeEquity.combo_classes()]
+            else:
+                RangeTracker._preflop_strengths = np.full(HandIndexer.NUM_HOLES, 0.5)
+        return RangeTracker._preflop_strengths
@@ -0,0 +1,107 @@
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class SharedEquityCache:
+    """Sampled equity per canonical spot in a shared-memory hash table.
+
+    Has the get/add/flush interface of EquityCache, so an EquityMemo in every
+    worker process of a tournament can use one table. Slots are fixed-size
+    and open-addressed with linear probing from a Fibonacci hash, which
+    needs a power-of-two slot count. Writers take one shared lock;
+    readers take none and instead retry while a slot's version is odd, which
+    marks a write in progress. When the table is full, new spots are
+    silently not cached.
+
+    Create the table once with create() and hand it to the workers as a
+    Process or ProcessPoolExecutor initializer argument; it pickles as a
+    reference to the same memory and lock.
+    """
+
+    NUM_SLOTS = 1 << 16
+    MAX_PROBES = 64
+    # Fibonacci hashing multiplier, 2**64 / golden ratio
+    HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+    MASK64 = (1 << 64) - 1
+
+    def __init__(self, memory, num_slots, lock, owner=False):
+        self.memory = memory
+        self.num_slots = num_slots
+        self._slot_bits = num_slots.bit_length() - 1
+        self._lock = lock
+        self._owner = owner
+        self._codes = np.ndarray((num_slots,), dtype=np.uint64, buffer=memory.buf)
+        self._versions = np.ndarray((num_slots,), dtype=np.uint64, buffer=memory.buf, offset=8 * num_slots)
+        self._moments = np.ndarray((num_slots, 3), dtype=np.float64, buffer=memory.buf, offset=16 * num_slots)
+
+    @classmethod
+    def create(self, num_slots=None, context=None):
+        """context is the multiprocessing context the workers will be started with."""
+        num_slots = self.NUM_SLOTS if num_slots is None else num_slots
+        if num_slots < 1 or num_slots & (num_slots - 1):
+            raise ValueError("Slot count must be a power of two [num_slots = %d]" % num_slots)
+        context = multiprocessing if context is None else context
+        memory = shared_memory.SharedMemory(create=True, size=40 * num_slots)
+        memory.buf[:] = bytes(len(memory.buf))
+        return self(memory, num_slots, context.Lock(), owner=True)
+
+    @classmethod
+    def attach(self, name, num_slots, lock):
+        return self(shared_memory.SharedMemory(name=name), num_slots, lock)
+
+    def __reduce__(self):
+        return (SharedEquityCache.attach, (self.memory.name, self.num_slots, self._lock))
+
+    def __len__(self):
+        return int(np.count_nonzero(self._codes))
+
+    def get(self, key):
+        code = self.__code(key)
+        for slot in self.__probe(code):
+            while True:
+                version = int(self._versions[slot])
+                slot_code = int(self._codes[slot])
+                total, total_sq, trials = self._moments[slot].tolist()
+                if not version & 1 and int(self._versions[slot]) == version:
+                    break
+            if slot_code == 0:
+                return None
+            if slot_code == code:
+                return (total, total_sq, int(trials))
+        return None
+
+    def add(self, key, moments):
+        """Add (sum, sum of squares, trials) of new trials for key."""
+        if moments[2] == 0:
+            return
+        code = self.__code(key)
+        with self._lock:
+            for slot in self.__probe(code):
+                if int(self._codes[slot]) in (0, code):
+                    self._versions[slot] += 1
+                    self._codes[slot] = code
+                    self._moments[slot] += moments
+                    self._versions[slot] += 1
+                    return
+
+    def flush(self):
+        pass
+
+    def close(self):
+        del self._codes, self._versions, self._moments
+        self.memory.close()
+        if self._owner:
+            self.memory.unlink()
+
+    def __code(self, key):
+        # (spot, opponents) packed into one non-zero integer; 0 marks an empty slot
+        spot, opponents = key
+        return (spot << 4 | opponents) + 1
+
+    def __probe(self, code):
+        # the top bits of the 64-bit product depend on every bit of code
+        start = ((code * self.HASH_MULTIPLIER) & self.MASK64) >> (64 - self._slot_bits)
+        mask = self.num_slots - 1
+        return [(start + i) & mask for i in range(min(self.MAX_PROBES, self.num_slots))]
@@ -0,0 +1,58 @@
+import time
+
+
+class TimeBudget:
+    """Splits a per-game thinking-time budget across the game's decisions.
+
+    Each decision gets the time left divided by the decisions still expected,
+    scaled by how large the pot is next to our stack. Time a decision does not
+    use goes back to the pool, so the whole game never spends more than
+    game_seconds on top of the fixed per-decision work.
+    """
+
+    # prior for decisions per round, refined by the observed counts
+    DECISIONS_PER_ROUND = 3
+    # stays well under the 50 second timeout in BasePokerPlayer.respond_to_ask
+    MAX_DECISION_SECONDS = 40
+    MIN_WEIGHT = 0.25
+    MAX_WEIGHT = 4.0
+    POT_WEIGHT = 8.0
+
+    def __init__(self, game_seconds, max_round):
+        self.game_seconds = game_seconds
+        self.max_round = max_round
+        self.spent = 0.0
+        self.round_count = 1
+        self.decisions = 0
+        self.round_decisions = 0
+
+    def remaining(self):
+        return max(0.0, self.game_seconds - self.spent)
+
+    def start_round(self, round_count):
+        self.round_count = round_count
+        self.round_decisions = 0
+
+    def expected_decisions_left(self):
+        rounds_played = self.round_count - 1
+        per_round = (self.decisions - self.round_decisions + self.DECISIONS_PER_ROUND) / (
+            rounds_played + 1
+        )
+        rounds_left = self.max_round - self.round_count + 1
+        return max(1.0, per_round * rounds_left - self.round_decisions)
+
+    def allocate(self, pot, stack):
+        """Seconds to spend on a decision about a pot of the given size."""
+        share = pot / max(1, pot + stack)
+        weight = min(self.MAX_WEIGHT, max(self.MIN_WEIGHT, share * self.POT_WEIGHT))
+        seconds = self.remaining() * weight / self.expected_decisions_left()
+        return min(seconds, self.remaining(), self.MAX_DECISION_SECONDS)
+
+    def deadline(self, pot, stack):
+        """time.monotonic() value by which the decision should be made."""
+        return time.monotonic() + self.allocate(pot, stack)
+
+    def record(self, seconds):
+        self.spent += seconds
+        self.decisions += 1
+        self.round_decisions += 1
@@ -11,6 +11,7 @@ def start_poker(config, verbose=2, decks=None):
     dealer = Dealer(config.sb_amount, config.initial_stack, config.ante)
     dealer.set_verbose(verbose)
     dealer.set_blind_structure(config.blind_structure)
+    dealer.set_copy_state(config.copy_state)
     for info in config.players_info:
         dealer.register_player(info["name"], info["algorithm"])
     result_message = dealer.start_game(config.max_round, decks)
@@ -28,6 +29,8 @@ class Config(object):
     def __init__(self, max_round, initial_stack, sb_amount, ante):
         self.players_info = []
         self.blind_structure = {}
+        # copy the round state on every action instead of updating it in place
+        self.copy_state = False
         self.max_round = max_round
         self.initial_stack = initial_stack
         self.sb_amount = sb_amount
@@ -44,6 +47,9 @@ class Config(object):
     def set_blind_structure(self, blind_structure):
         self.blind_structure = blind_structure
 
+    def set_copy_state(self, copy_state):
+        self.copy_state = copy_state
+
     def validation(self):
         player_num = len(self.players_info)
         if player_num < 2:
@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 import signal
 import time
@@ -21,8 +22,15 @@ class BasePokerPlayer(object):
     - receive_street_start_message
     - receive_game_update_message
     - receive_round_result_message
+
+    Work that only depends on the hole cards or the board can be started with
+    start_background when those become known. The job should leave its
+    results somewhere declare_action reads them, such as an EquityMemo,
+    rather than be waited on.
     """
 
+    _background_executor = None
+
     def __init__(self):
         pass
 
@@ -53,6 +61,21 @@ class BasePokerPlayer(object):
     def set_uuid(self, uuid):
         self.uuid = uuid
 
+    def start_background(self, key, task, *args, **kwargs):
+        """Run task(*args, **kwargs) on this player's worker thread and return its Future.
+
+        Jobs that have not started yet are dropped, since a new job means the
+        state they were computed for is stale.
+        """
+        if self._background_executor is None:
+            self._background_executor = ThreadPoolExecutor(max_workers=1)
+            self._background_jobs = {}
+        for job in self._background_jobs.values():
+            job.cancel()
+        future = self._background_executor.submit(task, *args, **kwargs)
+        self._background_jobs = {key: future}
+        return future
+
     def respond_to_ask(self, message):
         """Called from Dealer when ask message received from RoundManager"""
         valid_actions, hole_card, round_state = self.__parse_ask_message(message)
@@ -1,7 +1,8 @@
 import json
 from collections import defaultdict
-from agents.probability_player import setup_ai as probability_ai
-from agents.decision_player import setup_ai as decision_ai
+from agents.probability_player import setup_ai as probability_ai, ProbabilityAgent
+from agents.decision_player import setup_ai as decision_ai, DecisionPlayer
+from game.equity.equity_cache import EquityCache
 from check_base import CheckBaseline, BASELINES
 import argparse
 
@@ -11,9 +12,13 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument('-b')
     parser.add_argument('-m')
+    parser.add_argument('--equity-cache', help="SQLite file that keeps sampled equities across runs")
     
     args = parser.parse_args()
 
+    if args.equity_cache:
+        ProbabilityAgent.equity_cache = DecisionPlayer.equity_cache = EquityCache(args.equity_cache)
+
     idx = int(args.b)
     print([BASELINES[idx]])
 
@@ -1,49 +1,44 @@
+import random
+from itertools import combinations
+
 import matplotlib.pyplot as plt
 import numpy as np
 from game.engine.card import Card
 from game.engine.deck import Deck
 from game.engine.hand_evaluator import HandEvaluator
+from game.equity.preflop_table import PreflopTable
 
 def estimate_win_rate(hole_cards, community_cards=[], num_simulations=1000):
-    win = 0
-    for _ in range(num_simulations):
-        deck = Deck()
-        known = hole_cards + community_cards
-        deck.deck = [card for card in deck.deck if card not in known]
-        deck.shuffle()
-
-        opp_hole = deck.draw_cards(2)
-        community_fill = 5 - len(community_cards)
-        full_community = community_cards + deck.draw_cards(community_fill)
-
-        my_score = HandEvaluator.eval_hand(hole_cards, full_community)
-        opp_score = HandEvaluator.eval_hand(opp_hole, full_community)
-
-        assert my_score is not None, "My hand evaluation failed"
-        assert opp_score is not None, "Opponent hand evaluation failed"
-
-        if my_score > opp_score:
-            win += 1
-    return win / num_simulations
+    known = [card.to_id() for card in hole_cards + community_cards]
+    remaining = np.array([cid for cid in range(1, 53) if cid not in known])
+    community_fill = 5 - len(community_cards)
+
+    # one random permutation of the remaining deck per simulation
+    order = np.argsort(np.random.random((num_simulations, len(remaining))), axis=1)
+    draws = remaining[order[:, : 2 + community_fill]]
+    opp_hole = draws[:, :2]
+    known_community = np.repeat(
+        np.array([[card.to_id() for card in community_cards]], dtype=np.int64),
+        num_simulations,
+        axis=0,
+    )
+    full_community = np.hstack([known_community, draws[:, 2:]])
+    my_hole = np.repeat(np.array([known[:2]]), num_simulations, axis=0)
+
+    my_scores = HandEvaluator.eval_hands_batch(np.hstack([my_hole, full_community]))
+    opp_scores = HandEvaluator.eval_hands_batch(np.hstack([opp_hole, full_community]))
+    return np.mean(my_scores > opp_scores)
 
 
 def sample_winrates(num_samples=10, num_simulations_per_hand=1000):
-    winrates = []
-    seen_hands = set()
-
-    while len(winrates) < num_samples:
-        deck = Deck()
-        deck.shuffle()
-        hole_cards = deck.draw_cards(2)
-        key = tuple(sorted(str(c) for c in hole_cards))
-        if key in seen_hands:
-            continue
-        seen_hands.add(key)
-
-        winrate = estimate_win_rate(hole_cards, community_cards=[], num_simulations=num_simulations_per_hand)
-        winrates.append(winrate)
-
-    return winrates
+    all_holes = list(combinations(Deck().deck, 2))
+    sampled_holes = random.sample(all_holes, num_samples)
+    if PreflopTable.is_available():
+        return [PreflopTable.win_rate(hole) for hole in sampled_holes]
+    return [
+        estimate_win_rate(list(hole), community_cards=[], num_simulations=num_simulations_per_hand)
+        for hole in sampled_holes
+    ]
 
 
 # 抽樣並繪圖